@@ -0,0 +1,107 @@
+"""
+AdaptiveTraining
+ Tracks the effective VDOT of athletes from a stream of races and workouts
+ and adjusts the pace targets of the remaining weeks of their
+ DanielsTrainingPlan when their fitness changes.
+"""
+import datetime
+
+from DanielsTrainingPlanGenerator import *
+
+
+class FitnessEstimate(object):
+    """Exponentially weighted estimate of an athlete's VDOT.
+        Each race or workout moves the estimate towards the VDOT it implies
+        by its weight, so an update costs the same regardless of history.
+        Races are trusted more than workout paces by default.
+    """
+
+    def __init__(self, vdot, race_weight=0.5, workout_weight=0.1):
+        self.vdot = float(vdot)
+        self.race_weight = race_weight
+        self.workout_weight = workout_weight
+        self.events = 0
+
+    def update(self, vdot, weight):
+        """Move the estimate towards vdot by weight and return the new estimate"""
+        self.vdot += weight * (vdot - self.vdot)
+        self.events += 1
+        return self.vdot
+
+    def add_race(self, distance, time):
+        """Update the estimate from a race result. time is in seconds.
+            Distances without a VDOT formula raise a DomainException and
+            leave the estimate unchanged.
+        """
+        if distance not in VDOT_FORMULAS:
+            raise DomainException('No VDOT formula for distance %r.' % (distance,))
+        vdot = DanielsTrainingPlan.estimate_vdot(distance, time, DomainPolicy.clamp)
+        return self.update(vdot, self.race_weight)
+
+    def add_workout(self, zone, pace):
+        """Update the estimate from the pace a workout was run at in a PaceZone.
+            pace uses the units of get_pace for the zone.
+        """
+        return self.update(DanielsTrainingPlan.get_pace_vdot(zone, pace), self.workout_weight)
+
+
+class AdaptivePlanner(object):
+    """Keeps a FitnessEstimate per athlete and re-plans in batches.
+        Events only update the estimate and mark the athlete; replan then
+        visits the marked athletes and, when the estimate moved by at least
+        threshold since the last adjustment, resets the paces of the weeks
+        that have not started yet.
+    """
+
+    def __init__(self, threshold=0.5, race_weight=0.5, workout_weight=0.1):
+        self.threshold = threshold
+        self.race_weight = race_weight
+        self.workout_weight = workout_weight
+        self.__athletes = {}
+        self.__pending = set()
+
+    def add_athlete(self, athlete_id, plan, vdot=None):
+        """Track an athlete following plan. The plan needs a start_date.
+            vdot defaults to the vdot of the plan.
+        """
+        if vdot is None:
+            vdot = plan.vdot
+        if vdot <= 0:
+            raise TrainingGeneratorException('Athlete %r has no vdot.' % (athlete_id,))
+        if not isinstance(plan.start_date, datetime.date):
+            raise TrainingGeneratorException('The plan of athlete %r has no start_date.' % (athlete_id,))
+        estimate = FitnessEstimate(vdot, self.race_weight, self.workout_weight)
+        self.__athletes[athlete_id] = [plan, estimate, float(vdot)]
+
+    def get_estimate(self, athlete_id):
+        """Return the FitnessEstimate of an athlete"""
+        return self.__athletes[athlete_id][1]
+
+    def add_race(self, athlete_id, distance, time):
+        """Record a race result for an athlete"""
+        self.__athletes[athlete_id][1].add_race(distance, time)
+        self.__pending.add(athlete_id)
+
+    def add_workout(self, athlete_id, zone, pace):
+        """Record a workout pace for an athlete"""
+        self.__athletes[athlete_id][1].add_workout(zone, pace)
+        self.__pending.add(athlete_id)
+
+    def replan(self, date):
+        """Adjust the weeks starting after date for every athlete with new events.
+            Return a dict mapping athlete id to the list of adjusted week indexes.
+        """
+        adjusted = {}
+        for athlete_id in self.__pending:
+            entry = self.__athletes[athlete_id]
+            plan, estimate, applied = entry
+            if abs(estimate.vdot - applied) < self.threshold:
+                continue
+            first = max((date - plan.start_date).days // 7 + 1, 0)
+            weeks = list(range(first, len(plan)))
+            for weekindex in weeks:
+                plan.get_week(weekindex).set_vdot(estimate.vdot, DomainPolicy.clamp)
+            entry[2] = estimate.vdot
+            adjusted[athlete_id] = weeks
+        self.__pending.clear()
+        return adjusted
@@ -0,0 +1,87 @@
+"""Unit test case for AdaptiveTraining"""
+
+import datetime
+import unittest
+
+from AdaptiveTraining import *
+from TrainingPlanEncoder import *
+
+
+class TestAdaptiveTraining(unittest.TestCase):
+    """Test case for fitness estimates and adaptive re-planning"""
+
+    def setUp(self):
+        """Setup a planner with one athlete on a 12 week plan at vdot 50"""
+        generator = DanielsTrainingPlanGenerator()
+        generator.vdot = 50
+        self.plan = generator.generate_training_plan(12)
+        self.plan.start_date = datetime.date(2015, 3, 2)
+        self.planner = AdaptivePlanner(threshold=1)
+        self.planner.add_athlete('runner', self.plan)
+
+    def test_add_athlete(self):
+        """athletes need a vdot and a plan with a start_date"""
+        plan = DanielsTrainingPlanGenerator().generate_training_plan(12)
+        self.assertRaises(TrainingGeneratorException, self.planner.add_athlete, 'no vdot', plan)
+        self.assertRaises(TrainingGeneratorException, self.planner.add_athlete, 'no date', plan, 50)
+        plan.start_date = '2015-03-02'
+        self.assertRaises(TrainingGeneratorException, self.planner.add_athlete, 'no date', plan, 50)
+
+    def test_pace_vdot(self):
+        """get_pace_vdot inverts get_pace"""
+        for zone in (PaceZone.easy, PaceZone.threshold, PaceZone.interval):
+            for vdot in (34, 50.5, 74):
+                pace = DanielsTrainingPlan.get_pace(zone, vdot)
+                self.assertAlmostEqual(DanielsTrainingPlan.get_pace_vdot(zone, pace), vdot, places=4)
+        self.assertAlmostEqual(DanielsTrainingPlan.get_pace_vdot(PaceZone.easy, 10000), 30, places=4)
+
+    def test_estimate(self):
+        """estimates move towards observed fitness by their weight"""
+        estimate = FitnessEstimate(50, race_weight=0.5)
+        #vdot 58 5K
+        self.assertAlmostEqual(estimate.add_race(Distance.fiveK, 1053), 54, delta=1)
+        estimate.add_workout(PaceZone.threshold, DanielsTrainingPlan.get_T_pace(estimate.vdot))
+        self.assertAlmostEqual(estimate.vdot, 54, delta=1)
+        self.assertEqual(estimate.events, 2)
+
+    def test_unknown_race_distance(self):
+        """races without a VDOT formula don't change the estimate"""
+        estimate = FitnessEstimate(50)
+        self.assertRaises(DomainException, estimate.add_race, '10K', 2400)
+        self.assertEqual((estimate.vdot, estimate.events), (50, 0))
+        self.assertRaises(DomainException, self.planner.add_race, 'runner', '10K', 2400)
+        self.assertEqual(self.planner.replan(datetime.date(2015, 3, 25)), {})
+
+    def test_replan(self):
+        """only weeks after the event date are adjusted"""
+        self.planner.add_race('runner', Distance.fiveK, 1053)
+        adjusted = self.planner.replan(datetime.date(2015, 3, 25))
+        self.assertEqual(adjusted, {'runner': list(range(4, 12))})
+        vdot = self.planner.get_estimate('runner').vdot
+        self.assertEqual(self.plan.get_week(3).paces, {})
+        self.assertEqual(self.plan.get_week(4).vdot, vdot)
+        self.assertEqual(self.plan.get_week(11).paces[PaceZone.easy], DanielsTrainingPlan.get_E_pace(vdot))
+
+        #no new events, nothing to do
+        self.assertEqual(self.planner.replan(datetime.date(2015, 3, 25)), {})
+
+        #changes below the threshold are not applied
+        self.planner.add_workout('runner', PaceZone.easy, DanielsTrainingPlan.get_E_pace(vdot + 2))
+        self.assertEqual(self.planner.replan(datetime.date(2015, 3, 25)), {})
+
+    def test_replan_targets(self):
+        """adjusted week targets change the plan hash and survive encoding"""
+        before = self.plan.structural_hash()
+        self.planner.add_race('runner', Distance.fiveK, 1053)
+        self.planner.replan(datetime.date(2015, 3, 25))
+        self.assertNotEqual(before, self.plan.structural_hash())
+        for encode, decode in ((encode_plan_json, decode_plan_json),
+                               (encode_plan_msgpack, decode_plan_msgpack)):
+            plan = decode(encode(self.plan), DanielsPlanFactory())
+            self.assertEqual(self.plan.structural_hash(), plan.structural_hash())
+            self.assertEqual(plan.get_week(4).vdot, self.plan.get_week(4).vdot)
+            self.assertEqual(plan.get_week(11).paces, self.plan.get_week(11).paces)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,10 @@
 Classes that extend TrainingPlanGenerator to create a training plan for
 distance running following the methodology laid out in 'Daniel's Running Formula'.
 """
+import datetime
 import math
 from TrainingPlanGenerator import *
+from TrainingPlanEncoder import PlanFactory
 
 
 class Distance:
@@ -13,6 +15,139 @@ class Distance:
     halfMarathon = 'HALF'
 
 
+class PaceZone:
+    """Defines constant variables for the Daniels training pace zones"""
+    easy = 'E'
+    marathon = 'MP'
+    threshold = 'T'
+    interval = 'I'
+    repetition = 'R'
+
+
+class DomainPolicy:
+    """Defines how a GuardedPolynomial treats input outside its valid range"""
+    ignore = 'IGNORE'
+    clamp = 'CLAMP'
+    error = 'ERROR'
+
+
+class GuardedPolynomial(object):
+    """Interpolation polynomial with a valid input range.
+        Coefficients are ordered from the highest degree term down to the
+        constant term and are evaluated in floating point with Horner's method.
+        The unguarded evaluator is available as the evaluate attribute.
+    """
+
+    def __init__(self, name, coefficients, lower, upper):
+        self.name = name
+        self.coefficients = tuple(float(c) for c in coefficients)
+        self.lower = lower
+        self.upper = upper
+        self.evaluate = horner_function(self.coefficients)
+
+    def __call__(self, x, policy=DomainPolicy.ignore):
+        """Evaluate the polynomial at x, applying policy if x is out of range"""
+        if not self.lower <= x <= self.upper:
+            if policy == DomainPolicy.clamp:
+                x = min(max(x, self.lower), self.upper)
+            elif policy == DomainPolicy.error:
+                raise DomainException('%s is only valid for input in [%s, %s], got %s.'
+                                      % (self.name, self.lower, self.upper, x))
+        return self.evaluate(x)
+
+    def inverse(self, y, tolerance=1e-6):
+        """Return the input in the valid range at which the polynomial equals y,
+            found by bisection. The polynomial must be monotone over the range.
+            Values of y beyond the range map to the nearest end of the range.
+        """
+        lower, upper = float(self.lower), float(self.upper)
+        increasing = self.evaluate(upper) > self.evaluate(lower)
+        while upper - lower > tolerance:
+            middle = (lower + upper) / 2
+            if (self.evaluate(middle) < y) == increasing:
+                lower = middle
+            else:
+                upper = middle
+        return (lower + upper) / 2
+
+
+def horner_function(coefficients):
+    """Return a function evaluating the polynomial with the given coefficients
+        (highest degree first) by Horner's method. The degree 5 and 6
+        polynomials of the Daniels formulas are evaluated without a loop.
+    """
+    if len(coefficients) == 6:
+        a, b, c, d, e, f = coefficients
+
+        def evaluate(x):
+            return ((((a * x + b) * x + c) * x + d) * x + e) * x + f
+    elif len(coefficients) == 7:
+        a, b, c, d, e, f, g = coefficients
+
+        def evaluate(x):
+            return (((((a * x + b) * x + c) * x + d) * x + e) * x + f) * x + g
+    else:
+        def evaluate(x):
+            result = 0.0
+            for coefficient in coefficients:
+                result = result * x + coefficient
+            return result
+    return evaluate
+
+
+def scaled_coefficients(numerators, denominator):
+    """Return numerators divided by a common denominator as floats"""
+    return [float(numerator) / denominator for numerator in numerators]
+
+
+PACE_FORMULAS = {
+    PaceZone.easy: GuardedPolynomial(
+        'E pace',
+        scaled_coefficients((1, -400, 65500, -5640000, 273040000, -7528000000), -4000000),
+        30, 85),
+    PaceZone.marathon: GuardedPolynomial(
+        'MP pace',
+        scaled_coefficients((1, -310, 39500, -2675000, 103860000, -2342400000), -1200000),
+        30, 85),
+    PaceZone.threshold: GuardedPolynomial(
+        'T pace',
+        scaled_coefficients((6, -1825, 226500, -14787500, 545190000, -11538000000), -6000000),
+        30, 85),
+    PaceZone.interval: GuardedPolynomial(
+        'I pace',
+        scaled_coefficients((43, -14365, 1958500, -139117500, 5406220000, -107825600000, 814080000000),
+                            -300000000),
+        30, 80),
+    PaceZone.repetition: GuardedPolynomial(
+        'R pace',
+        scaled_coefficients((43, -14365, 1958500, -139117500, 5406220000, -107825600000, 815880000000),
+                            -300000000),
+        30, 80),
+}
+
+VDOT_FORMULAS = {
+    Distance.mile: GuardedPolynomial(
+        'Mile VDOT',
+        scaled_coefficients((11062131917, -22462979049676, 18327720036275892, -7632191499544608794,
+                             1685094023594714816671, -179040204830872483040250),
+                            -347688941959800849408),
+        230, 575),
+    Distance.fiveK: GuardedPolynomial(
+        '5K VDOT',
+        (-4.64251e-14, 3.23882e-10, -9.18404e-7, 0.00135191, -1.08304, 433.669),
+        800, 1900),
+    Distance.halfMarathon: GuardedPolynomial(
+        'Half marathon VDOT',
+        (-1286286097975706700479377.0 / 64269036097373591501110963538868801283500,
+         10531507148663303541867119324.0 / 16067259024343397875277740884717200320875,
+         -112303143116809271845625716823287.0 / 12853807219474718300222192707773760256700,
+         971399053320951386126727030420043261.0 / 16067259024343397875277740884717200320875,
+         -173904661026852921259534885968281768582.0 / 765107572587780851203701946891295253375,
+         44961468182799515563652488852220300362.0 / 105604909950004258275183153470158075),
+        3600, 8500),
+}
+
+
 class DanielsTrainingPlanGenerator(TrainingPlanGenerator):
     """Extends TrainingPlanGenerator. Creates a training plan based on
         given variables.
@@ -29,9 +164,69 @@ class DanielsTrainingPlanGenerator(TrainingPlanGenerator):
         plan = DanielsTrainingPlan()
         #fill out phases here
         plan.add_weeks(numweeks)
+        if self.vdot > 0:
+            plan.set_vdot(self.vdot)
 
         return plan
 
+    def generate_group_training_plans(self, numweeks, vdots, policy=DomainPolicy.ignore):
+        """Return a DanielsTrainingPlan for each vdot in vdots.
+            The phase layout is computed once for the group and paces once
+            per distinct vdot.
+            :rtype : list
+        """
+        layout = DanielsTrainingPlan.get_phase_layout(numweeks)
+        paces = get_group_paces(vdots, policy)
+        plans = []
+        for vdot in vdots:
+            plan = DanielsTrainingPlan()
+            plan.add_layout(layout)
+            plan.vdot = vdot
+            plan.paces = dict(paces[vdot])
+            plans.append(plan)
+        return plans
+
+    def generate_group_training_table(self, numweeks, vdots, policy=DomainPolicy.ignore):
+        """Return a GroupTrainingTable holding the shared phase layout and
+            one column of paces per zone, without building plan objects.
+            :rtype : GroupTrainingTable
+        """
+        layout = DanielsTrainingPlan.get_phase_layout(numweeks)
+        paces = get_group_paces(vdots, policy)
+        columns = dict((zone, [paces[vdot][zone] for vdot in vdots]) for zone in PACE_FORMULAS)
+        return GroupTrainingTable(layout, list(vdots), columns)
+
+
+def get_group_paces(vdots, policy=DomainPolicy.ignore):
+    """Return a dict mapping each distinct vdot to a dict of zone paces"""
+    paces = {}
+    for vdot in vdots:
+        if vdot not in paces:
+            paces[vdot] = dict((zone, formula(vdot, policy)) for zone, formula in PACE_FORMULAS.items())
+    return paces
+
+
+class GroupTrainingTable(object):
+    """Columnar result of a group plan generation. All athletes share the
+        phase layout; paces[zone][i] is the pace of athlete i.
+    """
+
+    def __init__(self, layout, vdots, paces):
+        self.layout = layout
+        self.vdots = vdots
+        self.paces = paces
+
+    def __len__(self):
+        return len(self.vdots)
+
+    def get_plan(self, index):
+        """Build the DanielsTrainingPlan of athlete index"""
+        plan = DanielsTrainingPlan()
+        plan.add_layout(self.layout)
+        plan.vdot = self.vdots[index]
+        plan.paces = dict((zone, column[index]) for zone, column in self.paces.items())
+        return plan
+
 
 ###########################################################################
 
@@ -42,14 +237,23 @@ class DanielsTrainingPlan(TrainingPlan):
                 Transition Quality, and Final Quality
     """
 
+    max_weeks = 24
+    hashed_attributes = ('vdot', 'paces')
+    vdot = hashed_property('vdot', -1)
+    paces = hashed_property('paces')
+
     def __init__(self):
         """initialize a Daniels Running Formula Training plan. Creates 4 phases"""
         super(DanielsTrainingPlan, self).__init__()
+        self._hashed_paces = {}
         self.add_phase(DanielsTrainingPhase(1))
         self.add_phase(DanielsTrainingPhase(2))
         self.add_phase(DanielsTrainingPhase(3))
         self.add_phase(DanielsTrainingPhase(4))
         self.numweeks = 0
+        self.start_date = None
+        self._date_index = None
+        self._date_index_key = None
 
     def __str__(self):
         ret = '%d week plan:' % self.numweeks
@@ -57,17 +261,65 @@ class DanielsTrainingPlan(TrainingPlan):
         for phase in self.get_phases():
             if len(phase) > 0:
                 i += 1
-                phase.phasenum = i
-                ret += '\n\t%s' % phase
+                ret += '\n\t%s' % phase.get_summary(i)
         return ret
 
+    def set_vdot(self, vdot, policy=DomainPolicy.ignore):
+        """Set the vdot of the plan and calculate the pace of every zone"""
+        self.vdot = vdot
+        self.paces = dict((zone, formula(vdot, policy)) for zone, formula in PACE_FORMULAS.items())
+
+    def get_date_index(self):
+        """Return a dict mapping every date of the plan to a tuple of
+            (week index, TrainingDay or None), counting from start_date.
+            The index is rebuilt only when start_date or the plan structure change.
+            :rtype : dict
+        """
+        if self.start_date is None:
+            raise TrainingGeneratorException('Plan has no start date.')
+        key = (self.start_date, self.structural_hash())
+        if self._date_index_key != key:
+            index = {}
+            for weekindex in range(len(self)):
+                days = dict((day.get_day_of_week(), day) for day in self.get_week(weekindex).get_days())
+                for day_of_week in range(1, 8):
+                    date = self.start_date + datetime.timedelta(days=weekindex * 7 + day_of_week - 1)
+                    index[date] = (weekindex, days.get(day_of_week))
+            self._date_index = index
+            self._date_index_key = key
+        return self._date_index
+
+    _layouts = {}
+
+    @staticmethod
+    def get_phase_layout(numweeks):
+        """Return a tuple holding the tuple of weeknums for each phase of a
+            plan of numweeks, as allocated by add_weeks. Cached per numweeks.
+        """
+        layout = DanielsTrainingPlan._layouts.get(numweeks)
+        if layout is None:
+            plan = DanielsTrainingPlan()
+            plan.add_weeks(numweeks)
+            layout = tuple(tuple(week.weeknum for week in phase.get_weeks()) for phase in plan.get_phases())
+            DanielsTrainingPlan._layouts[numweeks] = layout
+        return layout
+
+    def add_layout(self, layout):
+        """Add weeks to the phases as given by a get_phase_layout result"""
+        for phase, weeknums in zip(self.get_phases(), layout):
+            for weeknum in weeknums:
+                week = DanielsTrainingWeek()
+                week.weeknum = weeknum
+                phase.add_week(week)
+            self.numweeks += len(weeknums)
+
     def add_weeks(self, numweeks):
         """Adds a week to the appropriate phase and calls self recursively.
             Max weeks allowed is 24.
         """
         if 0 < numweeks:
             self.add_weeks(numweeks - 1)
-            if numweeks <= 24:
+            if numweeks <= self.max_weeks:
                 if numweeks == 24 or numweeks == 22 or numweeks == 17 or 3 < numweeks < 7:
                     phase = self.get_phase(3)
                     week = DanielsTrainingWeek()
@@ -94,127 +346,95 @@ class DanielsTrainingPlan(TrainingPlan):
                     self.numweeks += 1
 
     @staticmethod
-    def estimate_vdot(distance, time):
+    def estimate_vdot(distance, time, policy=DomainPolicy.ignore):
         """
         Estimate VDOT value given race distance and time.
         VDOT is approximate.
         Interpolation functions generated by Wolfram Alpha
+        :param policy: DomainPolicy applied when time is outside the valid
+            range for the distance. Unknown distances give 0 under
+            DomainPolicy.ignore and raise a DomainException otherwise, as
+            there is no range to clamp to.
         """
         vdot = 0
-        if distance == Distance.halfMarathon:
-            vdot = (((-1286286097975706700479377 * (time ** 5)) / 64269036097373591501110963538868801283500) +
-                    ((10531507148663303541867119324 * (time ** 4)) / 16067259024343397875277740884717200320875) -
-                    ((112303143116809271845625716823287 * (time ** 3)) / 12853807219474718300222192707773760256700) +
-                    ((971399053320951386126727030420043261 * (time ** 2)) / 16067259024343397875277740884717200320875) -
-                    ((173904661026852921259534885968281768582 * time) / 765107572587780851203701946891295253375) +
-                    44961468182799515563652488852220300362 / 105604909950004258275183153470158075)
-        elif distance == Distance.fiveK:
-            vdot = (((-4.64251 * (10 ** -14)) * (time ** 5)) +
-                    ((3.23882 * (10 ** -10)) * (time ** 4)) -
-                    ((9.18404 * (10 ** -7)) * (time ** 3)) +
-                    (0.00135191 * (time ** 2)) -
-                    (1.08304 * time) +
-                    433.669)
-        elif distance == Distance.mile:
-            vdot = -1 * (((11062131917 * (time ** 5)) -
-                          (22462979049676 * (time ** 4)) +
-                          (18327720036275892 * (time ** 3)) -
-                          (7632191499544608794 * (time ** 2)) +
-                          (1685094023594714816671 * time) -
-                          179040204830872483040250) /
-                         347688941959800849408)
+        formula = VDOT_FORMULAS.get(distance)
+        if formula is not None:
+            vdot = formula(time, policy)
+        elif policy != DomainPolicy.ignore:
+            raise DomainException('No VDOT formula for distance %r.' % (distance,))
         vdot = math.ceil(vdot)
         return vdot
 
     @staticmethod
-    def get_E_pace(vdot):
+    def get_pace(zone, vdot, policy=DomainPolicy.ignore):
+        """
+        Calculate the pace for a PaceZone based on vdot.
+        E, MP and T paces are per mile. I and R paces are per 400m.
+        ALL PACES ARE APPROXIMATE.
+        :param policy: DomainPolicy applied when vdot is outside the valid
+            range for the zone.
+        :rtype : float
+        """
+        return PACE_FORMULAS[zone](vdot, policy)
+
+    @staticmethod
+    def get_pace_vdot(zone, pace):
+        """
+        Return the vdot whose pace for the PaceZone is pace, limited to the
+        valid range of the zone. The inverse of get_pace.
+        :rtype : float
+        """
+        return PACE_FORMULAS[zone].inverse(pace)
+
+    @staticmethod
+    def get_E_pace(vdot, policy=DomainPolicy.ignore):
         """
         Calculate Mile E Pace based on vdot
         ALL PACES ARE APPROXIMATE.
         :param vdot:
-        :rtype : int
+        :rtype : float
         """
-        pace = -1 * (((vdot ** 5) -
-                      (400 * (vdot ** 4)) +
-                      (65500 * (vdot ** 3)) -
-                      (5640000 * (vdot ** 2)) +
-                      (273040000 * vdot) -
-                      7528000000) /
-                     4000000)
-        return pace
+        return PACE_FORMULAS[PaceZone.easy](vdot, policy)
 
     @staticmethod
-    def get_MP_pace(vdot):
+    def get_MP_pace(vdot, policy=DomainPolicy.ignore):
         """
         Calculate Mile MP pace based on vdot
         ALL PACES ARE APPROXIMATE.
         :param vdot:
-        :rtype : int
+        :rtype : float
         """
-        pace = -1 * (((vdot ** 5) -
-                      (310 * (vdot ** 4)) +
-                      (39500 * (vdot ** 3)) -
-                      (2675000 * (vdot ** 2)) +
-                      (103860000 * vdot) -
-                      2342400000) /
-                     1200000)
-
-        return pace
+        return PACE_FORMULAS[PaceZone.marathon](vdot, policy)
 
     @staticmethod
-    def get_T_pace(vdot):
+    def get_T_pace(vdot, policy=DomainPolicy.ignore):
         """
         Calculate Mile T pace based on vdot
         ALL PACES ARE APPROXIMATE.
         :param vdot:
-        :rtype : int
+        :rtype : float
         """
-        pace = -1 * (((6 * (vdot ** 5)) -
-                      (1825 * (vdot ** 4)) +
-                      (226500 * (vdot ** 3)) -
-                      (14787500 * (vdot ** 2)) +
-                      (545190000 * vdot) -
-                      11538000000) /
-                     6000000)
-
-        return pace
+        return PACE_FORMULAS[PaceZone.threshold](vdot, policy)
 
     @staticmethod
-    def get_I_pace(vdot):
+    def get_I_pace(vdot, policy=DomainPolicy.ignore):
         """
         Calculate 400m I pace based on vdot
         ALL PACES ARE APPROXIMATE.
         :param vdot:
-        :rtype : int
+        :rtype : float
         """
-        pace = -1 * (((43 * (vdot ** 6)) -
-                      (14365 * (vdot ** 5)) +
-                      (1958500 * (vdot ** 4)) -
-                      (139117500 * (vdot ** 3)) +
-                      (5406220000 * (vdot ** 2)) -
-                      (107825600000 * vdot) +
-                      814080000000) /
-                     300000000)
-        return pace
+        return PACE_FORMULAS[PaceZone.interval](vdot, policy)
 
     @staticmethod
-    def get_R_pace(vdot):
+    def get_R_pace(vdot, policy=DomainPolicy.ignore):
         """
         Calculate 400m R pace based on vdot
         ALL PACES ARE APPROXIMATE.
         :param vdot:
-        :rtype : int
+        :rtype : float
         """
-        pace = -1 * (((43 * (vdot ** 6)) -
-                      (14365 * (vdot ** 5)) +
-                      (1958500 * (vdot ** 4)) -
-                      (139117500 * (vdot ** 3)) +
-                      (5406220000 * (vdot ** 2)) -
-                      (107825600000 * vdot) +
-                      815880000000) /
-                     300000000)
-
-        return pace
+        return PACE_FORMULAS[PaceZone.repetition](vdot, policy)
 
 
 ###########################################################################
@@ -243,13 +463,37 @@ class DanielsTrainingPhase(TrainingPhase):
         return ret
 
     def __str__(self):
-        return 'Phase %d (%s): %d weeks' % (self.phasenum, self.desc, self.get_num_weeks())
+        return self.get_summary()
+
+    def get_summary(self, phasenum=None):
+        """Return the one line summary of the phase, numbered phasenum
+            instead of its own phase number if given.
+        """
+        if phasenum is None:
+            phasenum = self.phasenum
+        return 'Phase %d (%s): %d weeks' % (phasenum, self.desc, self.get_num_weeks())
 
 
 ###########################################################################
 
 class DanielsTrainingWeek(TrainingWeek):
-    """Extends TrainingWeek"""
+    """Extends TrainingWeek. May carry its own vdot and pace targets,
+        which take precedence over those of the plan.
+    """
+
+    hashed_attributes = ('weeknum', 'vdot', 'paces')
+    vdot = hashed_property('vdot', -1)
+    paces = hashed_property('paces')
+
+    def __init__(self):
+        """Initialize a week without targets of its own"""
+        super(DanielsTrainingWeek, self).__init__()
+        self._hashed_paces = {}
+
+    def set_vdot(self, vdot, policy=DomainPolicy.ignore):
+        """Set the vdot of the week and calculate the pace of every zone"""
+        self.vdot = vdot
+        self.paces = dict((zone, formula(vdot, policy)) for zone, formula in PACE_FORMULAS.items())
 
     def __repr__(self):
         ret = 'Week %i (' % self.weeknum
@@ -269,16 +513,28 @@ class DanielsTrainingDay(TrainingDay):
     ###########################################################################
 
 
-class DanielsTrainingWorkout():
+class DanielsTrainingWorkout(StructuralNode):
     """Defines a Daniels workout."""
 
+    hashed_attributes = ('desc',)
+    desc = hashed_property('desc')
+
     def __init__(self):
         """Initialize the workout instance"""
-        self.desc = ""
+        self._hashed_desc = ""
 
     def __repr__(self):
         return self.desc
 
+    def get_zone(self):
+        """Return the PaceZone the workout is run at, taken from the end of
+            the description ('E', '2 x 5 min @ T'), or None.
+        """
+        zone = self.desc.rsplit('@', 1)[-1].strip()
+        if zone in PACE_FORMULAS:
+            return zone
+        return None
+
     def get_pretty_print(self, tabs):
         """return string for printing human readable workout"""
         ret = '\t' * tabs
@@ -286,5 +542,42 @@ class DanielsTrainingWorkout():
         return ret
 
 
+###########################################################################
+
+class DanielsPlanFactory(PlanFactory):
+    """PlanFactory that decodes wire documents into Daniels plan objects"""
+
+    def new_plan(self, plan_type, vdot, paces):
+        plan = DanielsTrainingPlan()
+        plan.vdot = vdot
+        plan.paces = paces
+        return plan
+
+    def new_phase(self, plan, index, phasenum, desc):
+        phase = plan.get_phase(index)
+        if phase is None:
+            raise PhaseNumberException('Daniels training plans do not have more than 4 phases.')
+        phase.phasenum = phasenum
+        return phase
+
+    def new_week(self, weeknum, vdot, paces):
+        week = DanielsTrainingWeek()
+        week.weeknum = weeknum
+        week.vdot = vdot
+        week.paces = paces
+        return week
+
+    def new_day(self, day_of_week):
+        return DanielsTrainingDay(day_of_week)
+
+    def new_workout(self, desc):
+        workout = DanielsTrainingWorkout()
+        workout.desc = desc
+        return workout
+
+    def finish_plan(self, plan):
+        plan.numweeks = len(plan)
+
+
 if __name__ == '__main__':
     gen = DanielsTrainingPlanGenerator()
\ No newline at end of file
@@ -111,6 +111,63 @@ class TestDanielsFormula(unittest.TestCase):
         phase = plan.get_phase(3)
         self.assertEqual(len(phase), 6)
 
+    def test_phase_layout(self):
+        """test plans built from the cached layout match add_weeks"""
+        for numweeks in (3, 12, 17, 24, 26):
+            plan = DanielsTrainingPlan()
+            plan.add_layout(DanielsTrainingPlan.get_phase_layout(numweeks))
+            reference = self.generator.generate_training_plan(numweeks)
+            self.assertEqual(reference.structural_hash(), plan.structural_hash())
+            self.assertEqual(reference.numweeks, plan.numweeks)
+
+    def test_render_keeps_hash(self):
+        """test rendering a plan doesn't renumber its phases"""
+        plan = self.generator.generate_training_plan(6)
+        reference = self.generator.generate_training_plan(6)
+        before = plan.structural_hash()
+        text = str(plan)
+        plan.get_pretty_print()
+        self.assertIn('Phase 2 (Final Quality): 3 weeks', text)
+        self.assertEqual([phase.phasenum for phase in plan.get_phases()], [1, 2, 3, 4])
+        self.assertEqual(before, plan.structural_hash())
+        self.assertEqual(diff_plans(reference, plan), [])
+
+    def test_group_plans(self):
+        """test group generation gives each athlete their own paces"""
+        vdots = [42, 56, 42, 64]
+        plans = self.generator.generate_group_training_plans(16, vdots)
+        self.assertEqual(len(plans), 4)
+        for plan, vdot in zip(plans, vdots):
+            self.assertEqual(len(plan), 16)
+            self.assertEqual(plan.vdot, vdot)
+            self.assertEqual(plan.paces[PaceZone.easy], DanielsTrainingPlan.get_E_pace(vdot))
+            self.assertEqual(plan.paces[PaceZone.repetition], DanielsTrainingPlan.get_R_pace(vdot))
+        #plans only differ by their vdot and paces
+        self.assertEqual(plans[0].structural_hash(), plans[2].structural_hash())
+        self.assertNotEqual(plans[0].structural_hash(), plans[3].structural_hash())
+        self.assertEqual([change[0] for change in diff_plans(plans[0], plans[3])], [()])
+
+    def test_group_table(self):
+        """test the columnar group result matches individual plans"""
+        vdots = [42, 56, 64]
+        table = self.generator.generate_group_training_table(16, vdots)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.paces[PaceZone.threshold][1], DanielsTrainingPlan.get_T_pace(56))
+        self.generator.vdot = 64
+        reference = self.generator.generate_training_plan(16)
+        plan = table.get_plan(2)
+        self.assertEqual(reference.structural_hash(), plan.structural_hash())
+        self.assertEqual(reference.paces, plan.paces)
+
+    def test_paces_not_shared(self):
+        """each plan and week starts with its own empty paces"""
+        plan = DanielsTrainingPlan()
+        plan.paces[PaceZone.easy] = 1
+        self.assertEqual(DanielsTrainingPlan().paces, {})
+        week = DanielsTrainingWeek()
+        week.paces[PaceZone.easy] = 1
+        self.assertEqual(DanielsTrainingWeek().paces, {})
+
     def test_e_pace(self):
         """test e pace formula is aproximately correct"""
         #6:45 E Pace
@@ -222,6 +279,43 @@ class TestDanielsFormula(unittest.TestCase):
         pace = DanielsTrainingPlan.get_R_pace(56)
         self.assertAlmostEqual(80, pace, delta=2)
 
+    def test_pace_domain_policy(self):
+        """test out of range vdot is clamped or rejected on request"""
+        #in range values are unaffected by the policy
+        pace = DanielsTrainingPlan.get_E_pace(56, DomainPolicy.error)
+        self.assertEqual(DanielsTrainingPlan.get_E_pace(56), pace)
+
+        #clamped values match the edge of the valid range
+        pace = DanielsTrainingPlan.get_I_pace(90, DomainPolicy.clamp)
+        self.assertEqual(DanielsTrainingPlan.get_I_pace(80), pace)
+        pace = DanielsTrainingPlan.get_T_pace(10, DomainPolicy.clamp)
+        self.assertEqual(DanielsTrainingPlan.get_T_pace(30), pace)
+
+        self.assertRaises(DomainException, DanielsTrainingPlan.get_R_pace, 90, DomainPolicy.error)
+        self.assertRaises(DomainException, DanielsTrainingPlan.get_pace,
+                          PaceZone.marathon, 29, DomainPolicy.error)
+
+    def test_estimate_vdot_domain_policy(self):
+        """test out of range race times are clamped or rejected on request"""
+        vdot = DanielsTrainingPlan.estimate_vdot(Distance.fiveK, 3000, DomainPolicy.clamp)
+        self.assertEqual(DanielsTrainingPlan.estimate_vdot(Distance.fiveK, 1900), vdot)
+        self.assertRaises(DomainException, DanielsTrainingPlan.estimate_vdot,
+                          Distance.mile, 100, DomainPolicy.error)
+
+        #unknown distances
+        self.assertEqual(DanielsTrainingPlan.estimate_vdot('10K', 2400), 0)
+        self.assertRaises(DomainException, DanielsTrainingPlan.estimate_vdot,
+                          '10K', 2400, DomainPolicy.error)
+        self.assertRaises(DomainException, DanielsTrainingPlan.estimate_vdot,
+                          '10K', 2400, DomainPolicy.clamp)
+
+    def test_guarded_polynomial(self):
+        """test horner evaluation matches the expanded polynomial"""
+        formula = GuardedPolynomial('test', (2, -3, 0, 5), 0, 10)
+        for x in (0, 1.5, 4, 10):
+            self.assertAlmostEqual(2 * x ** 3 - 3 * x ** 2 + 5, formula(x))
+        self.assertEqual(formula(12, DomainPolicy.clamp), formula(10))
+
     def test_estimate_vdot(self):
         """validate vdot interpolation function"""
         print 'testing mile vdot estimates'
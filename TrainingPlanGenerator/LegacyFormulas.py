@@ -0,0 +1,115 @@
+"""
+LegacyFormulas
+ The Daniels pace and VDOT formulas as originally written, as expanded
+ polynomials. PlanValidation checks the current formulas against them and
+ the benchmarks time the current formulas against them.
+"""
+# The expressions divide integers, which Python 2 truncated. They are
+# evaluated with true division so they give the values the current
+# formulas were derived from.
+from __future__ import division
+
+from DanielsTrainingPlanGenerator import Distance, PaceZone
+
+
+def legacy_E_pace(vdot):
+    """E pace as originally written, expanded polynomial form"""
+    return -1 * (((vdot ** 5) -
+                  (400 * (vdot ** 4)) +
+                  (65500 * (vdot ** 3)) -
+                  (5640000 * (vdot ** 2)) +
+                  (273040000 * vdot) -
+                  7528000000) /
+                 4000000)
+
+
+def legacy_MP_pace(vdot):
+    """MP pace as originally written, expanded polynomial form"""
+    return -1 * (((vdot ** 5) -
+                  (310 * (vdot ** 4)) +
+                  (39500 * (vdot ** 3)) -
+                  (2675000 * (vdot ** 2)) +
+                  (103860000 * vdot) -
+                  2342400000) /
+                 1200000)
+
+
+def legacy_T_pace(vdot):
+    """T pace as originally written, expanded polynomial form"""
+    return -1 * (((6 * (vdot ** 5)) -
+                  (1825 * (vdot ** 4)) +
+                  (226500 * (vdot ** 3)) -
+                  (14787500 * (vdot ** 2)) +
+                  (545190000 * vdot) -
+                  11538000000) /
+                 6000000)
+
+
+def legacy_I_pace(vdot):
+    """I pace as originally written, expanded polynomial form"""
+    return -1 * (((43 * (vdot ** 6)) -
+                  (14365 * (vdot ** 5)) +
+                  (1958500 * (vdot ** 4)) -
+                  (139117500 * (vdot ** 3)) +
+                  (5406220000 * (vdot ** 2)) -
+                  (107825600000 * vdot) +
+                  814080000000) /
+                 300000000)
+
+
+def legacy_R_pace(vdot):
+    """R pace as originally written, expanded polynomial form"""
+    return -1 * (((43 * (vdot ** 6)) -
+                  (14365 * (vdot ** 5)) +
+                  (1958500 * (vdot ** 4)) -
+                  (139117500 * (vdot ** 3)) +
+                  (5406220000 * (vdot ** 2)) -
+                  (107825600000 * vdot) +
+                  815880000000) /
+                 300000000)
+
+
+def legacy_mile_vdot(time):
+    """Mile VDOT as originally written, before ceil"""
+    return -1 * (((11062131917 * (time ** 5)) -
+                  (22462979049676 * (time ** 4)) +
+                  (18327720036275892 * (time ** 3)) -
+                  (7632191499544608794 * (time ** 2)) +
+                  (1685094023594714816671 * time) -
+                  179040204830872483040250) /
+                 347688941959800849408)
+
+
+def legacy_fiveK_vdot(time):
+    """5K VDOT as originally written, before ceil"""
+    return (((-4.64251 * (10 ** -14)) * (time ** 5)) +
+            ((3.23882 * (10 ** -10)) * (time ** 4)) -
+            ((9.18404 * (10 ** -7)) * (time ** 3)) +
+            (0.00135191 * (time ** 2)) -
+            (1.08304 * time) +
+            433.669)
+
+
+def legacy_half_vdot(time):
+    """Half marathon VDOT as originally written, big integer form, before ceil"""
+    return (((-1286286097975706700479377 * (time ** 5)) / 64269036097373591501110963538868801283500) +
+            ((10531507148663303541867119324 * (time ** 4)) / 16067259024343397875277740884717200320875) -
+            ((112303143116809271845625716823287 * (time ** 3)) / 12853807219474718300222192707773760256700) +
+            ((971399053320951386126727030420043261 * (time ** 2)) / 16067259024343397875277740884717200320875) -
+            ((173904661026852921259534885968281768582 * time) / 765107572587780851203701946891295253375) +
+            44961468182799515563652488852220300362 / 105604909950004258275183153470158075)
+
+
+# The original expressions by zone and distance
+LEGACY_PACES = {
+    PaceZone.easy: legacy_E_pace,
+    PaceZone.marathon: legacy_MP_pace,
+    PaceZone.threshold: legacy_T_pace,
+    PaceZone.interval: legacy_I_pace,
+    PaceZone.repetition: legacy_R_pace,
+}
+LEGACY_VDOTS = {
+    Distance.mile: legacy_mile_vdot,
+    Distance.fiveK: legacy_fiveK_vdot,
+    Distance.halfMarathon: legacy_half_vdot,
+}
@@ -0,0 +1,70 @@
+"""
+PaceTables
+ Converts Daniels zone paces to any distance and unit.
+ get_E_pace, get_MP_pace and get_T_pace give seconds per mile while
+ get_I_pace and get_R_pace give seconds per 400m; a PaceTable holds the
+ pace of every zone per meter and per unit, and is cached per vdot so
+ scenario and validation runs never repeat the conversion.
+"""
+from DanielsTrainingPlanGenerator import *
+
+METERS_PER_MILE = 1609.344
+
+
+class Unit:
+    """Defines constant variables for pace units"""
+    metric = 'KM'
+    imperial = 'MILE'
+
+
+UNIT_METERS = {
+    Unit.metric: 1000.0,
+    Unit.imperial: METERS_PER_MILE,
+}
+
+# distance in meters that the get_pace result of each zone is for
+ZONE_METERS = {
+    PaceZone.easy: METERS_PER_MILE,
+    PaceZone.marathon: METERS_PER_MILE,
+    PaceZone.threshold: METERS_PER_MILE,
+    PaceZone.interval: 400.0,
+    PaceZone.repetition: 400.0,
+}
+
+
+class PaceTable(object):
+    """Paces of every zone for one vdot.
+        meter_paces[zone] is the zone pace in seconds per meter and
+        unit_paces[unit][zone] in seconds per km or mile.
+    """
+
+    def __init__(self, vdot, policy=DomainPolicy.ignore):
+        self.vdot = vdot
+        self.meter_paces = dict((zone, formula(vdot, policy) / ZONE_METERS[zone])
+                                for zone, formula in PACE_FORMULAS.items())
+        self.unit_paces = dict((unit, dict((zone, pace * meters) for zone, pace in self.meter_paces.items()))
+                               for unit, meters in UNIT_METERS.items())
+
+    def get_pace(self, zone, unit=Unit.imperial):
+        """Return the zone pace in seconds per km or mile"""
+        return self.unit_paces[unit][zone]
+
+    def get_time(self, zone, meters):
+        """Return the time in seconds to run meters at the zone pace"""
+        return self.meter_paces[zone] * meters
+
+
+_tables = {}
+_MAX_TABLES = 1024
+
+
+def get_pace_table(vdot, policy=DomainPolicy.ignore):
+    """Return the cached PaceTable for vdot, building it on first use"""
+    key = (vdot, policy)
+    table = _tables.get(key)
+    if table is None:
+        if len(_tables) >= _MAX_TABLES:
+            _tables.clear()
+        table = PaceTable(vdot, policy)
+        _tables[key] = table
+    return table
@@ -0,0 +1,38 @@
+"""Unit test case for PaceTables"""
+
+import unittest
+
+from PaceTables import *
+
+
+class TestPaceTables(unittest.TestCase):
+    """Test case for pace conversion tables"""
+
+    def test_units(self):
+        """zone paces convert between per mile, per km and per 400m"""
+        table = get_pace_table(56)
+        self.assertAlmostEqual(table.get_pace(PaceZone.easy), DanielsTrainingPlan.get_E_pace(56))
+        self.assertAlmostEqual(table.get_pace(PaceZone.easy, Unit.metric),
+                               DanielsTrainingPlan.get_E_pace(56) * 1000 / METERS_PER_MILE)
+        self.assertAlmostEqual(table.get_time(PaceZone.interval, 400), DanielsTrainingPlan.get_I_pace(56))
+        self.assertAlmostEqual(table.get_pace(PaceZone.repetition),
+                               DanielsTrainingPlan.get_R_pace(56) * METERS_PER_MILE / 400)
+
+    def test_times(self):
+        """times scale with distance"""
+        table = get_pace_table(64)
+        for zone in PACE_FORMULAS:
+            self.assertAlmostEqual(table.get_time(zone, 800), table.get_time(zone, 400) * 2)
+            self.assertAlmostEqual(table.get_time(zone, METERS_PER_MILE), table.get_pace(zone))
+            self.assertAlmostEqual(table.get_time(zone, 5000), table.get_pace(zone, Unit.metric) * 5)
+
+    def test_cache(self):
+        """tables are built once per vdot and policy"""
+        self.assertIs(get_pace_table(50), get_pace_table(50))
+        self.assertIsNot(get_pace_table(50), get_pace_table(50, DomainPolicy.clamp))
+        self.assertEqual(get_pace_table(90, DomainPolicy.clamp).get_time(PaceZone.interval, 400),
+                         get_pace_table(80).get_time(PaceZone.interval, 400))
+
+
+if __name__ == '__main__':
+    unittest.main()
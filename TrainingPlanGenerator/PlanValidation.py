@@ -0,0 +1,168 @@
+"""
+PlanValidation
+ Exhaustive invariant checks for Daniels plans and paces.
+ Sweeps every plan length, every vdot of each pace formula's valid range
+ and every race time of each VDOT formula's valid range, split into tasks
+ run across a process pool. Formulas are checked against the original
+ expanded expressions kept in LegacyFormulas.
+ Run directly: python PlanValidation.py [processes]
+"""
+import math
+import multiprocessing
+import sys
+from fractions import Fraction
+
+from DanielsTrainingPlanGenerator import *
+from PaceTables import ZONE_METERS, get_pace_table
+from LegacyFormulas import LEGACY_PACES, LEGACY_VDOTS
+
+VDOT_STEP = 0.1
+PACE_TOLERANCE = 1e-9
+VDOT_EPSILON = 1e-9
+GROUP_VDOTS = (30, 42, 42.5, 56, 64, 80)
+
+
+def frange(lower, upper, step):
+    """Return the list of values from lower to upper inclusive by step"""
+    return [lower + i * step for i in range(int(round((upper - lower) / step)) + 1)]
+
+
+def check_plan(numweeks):
+    """Check the phase allocation of a plan of numweeks"""
+    failures = []
+    generator = DanielsTrainingPlanGenerator()
+    plan = generator.generate_training_plan(numweeks)
+    expected = min(max(numweeks, 0), DanielsTrainingPlan.max_weeks)
+    if not len(plan) == plan.numweeks == sum(len(phase) for phase in plan.get_phases()) == expected:
+        failures.append('%d weeks: plan has %d weeks, numweeks %d' % (numweeks, len(plan), plan.numweeks))
+    if [phase.phasenum for phase in plan.get_phases()] != [1, 2, 3, 4]:
+        failures.append('%d weeks: phases out of order' % numweeks)
+    weeknums = []
+    for phase in plan.get_phases():
+        nums = [week.weeknum for week in phase.get_weeks()]
+        if nums != sorted(nums):
+            failures.append('%d weeks: phase %d weeks out of order' % (numweeks, phase.phasenum))
+        weeknums.extend(nums)
+    if sorted(weeknums) != list(range(1, expected + 1)):
+        failures.append('%d weeks: weeks %r are not 1 to %d' % (numweeks, sorted(weeknums), expected))
+
+    #a longer plan only adds weeks
+    if 1 < numweeks <= DanielsTrainingPlan.max_weeks:
+        shorter = DanielsTrainingPlan.get_phase_layout(numweeks - 1)
+        longer = DanielsTrainingPlan.get_phase_layout(numweeks)
+        if any(set(before) - set(after) for before, after in zip(shorter, longer)):
+            failures.append('%d weeks: moves weeks of the %d week plan' % (numweeks, numweeks - 1))
+
+    #fast paths match the reference
+    layout_plan = DanielsTrainingPlan()
+    layout_plan.add_layout(DanielsTrainingPlan.get_phase_layout(numweeks))
+    if layout_plan.structural_hash() != plan.structural_hash() or layout_plan.numweeks != plan.numweeks:
+        failures.append('%d weeks: layout plan differs from add_weeks' % numweeks)
+    group = generator.generate_group_training_plans(numweeks, GROUP_VDOTS)
+    table = generator.generate_group_training_table(numweeks, GROUP_VDOTS)
+    for i, vdot in enumerate(GROUP_VDOTS):
+        generator.vdot = vdot
+        reference = generator.generate_training_plan(numweeks)
+        for fast in (group[i], table.get_plan(i)):
+            if fast.structural_hash() != reference.structural_hash() or fast.paces != reference.paces:
+                failures.append('%d weeks: group plan for vdot %s differs' % (numweeks, vdot))
+    return failures
+
+
+def check_paces(zone):
+    """Check a pace formula over its valid range"""
+    failures = []
+    formula = PACE_FORMULAS[zone]
+    previous = None
+    for vdot in frange(formula.lower, formula.upper, VDOT_STEP):
+        pace = DanielsTrainingPlan.get_pace(zone, vdot)
+        if previous is not None and not pace < previous:
+            failures.append('%s pace not decreasing at vdot %.1f' % (zone, vdot))
+        previous = pace
+        reference = float(LEGACY_PACES[zone](Fraction(vdot)))
+        if abs(pace - reference) > PACE_TOLERANCE * abs(reference):
+            failures.append('%s pace at vdot %.1f is %r, expected %r' % (zone, vdot, pace, reference))
+        table = get_pace_table(vdot)
+        if abs(table.get_time(zone, ZONE_METERS[zone]) - pace) > 1e-9 * pace:
+            failures.append('%s pace table at vdot %.1f differs' % (zone, vdot))
+        if abs(DanielsTrainingPlan.get_pace_vdot(zone, pace) - vdot) > 1e-4:
+            failures.append('%s pace vdot at vdot %.1f differs' % (zone, vdot))
+    return failures
+
+
+def check_zone_order():
+    """Check zones are ordered from slowest to fastest at every vdot"""
+    failures = []
+    lower = max(formula.lower for formula in PACE_FORMULAS.values())
+    upper = min(formula.upper for formula in PACE_FORMULAS.values())
+    for vdot in frange(lower, upper, VDOT_STEP):
+        table = get_pace_table(vdot)
+        paces = [table.get_pace(zone) for zone in (PaceZone.easy, PaceZone.marathon, PaceZone.threshold,
+                                                   PaceZone.interval, PaceZone.repetition)]
+        if paces != sorted(paces, reverse=True):
+            failures.append('zones out of order at vdot %.1f: %r' % (vdot, paces))
+    return failures
+
+
+def check_vdot(distance):
+    """Check a VDOT formula over its valid range, one second at a time"""
+    failures = []
+    formula = VDOT_FORMULAS[distance]
+    previous = None
+    for time in range(int(math.ceil(formula.lower)), int(formula.upper) + 1):
+        vdot = DanielsTrainingPlan.estimate_vdot(distance, time)
+        if previous is not None and vdot > previous:
+            failures.append('%s VDOT increases at %d seconds' % (distance, time))
+        previous = vdot
+        #compared before ceil, which can't agree exactly where the VDOT is an integer
+        value = formula(time)
+        reference = float(LEGACY_VDOTS[distance](Fraction(time)))
+        if abs(value - reference) > VDOT_EPSILON or vdot != math.ceil(value):
+            failures.append('%s VDOT at %d seconds is %r, expected %r' % (distance, time, value, reference))
+    return failures
+
+
+def run_task(task):
+    """Run one (check name, argument) task and return its failures"""
+    name, argument = task
+    if name == 'plan':
+        return check_plan(argument)
+    if name == 'paces':
+        return check_paces(argument)
+    if name == 'vdot':
+        return check_vdot(argument)
+    return check_zone_order()
+
+
+def get_tasks():
+    """Return the list of tasks covering the whole domain"""
+    tasks = [('plan', numweeks) for numweeks in range(0, DanielsTrainingPlan.max_weeks + 3)]
+    tasks.extend(('paces', zone) for zone in sorted(PACE_FORMULAS))
+    tasks.extend(('vdot', distance) for distance in sorted(VDOT_FORMULAS))
+    tasks.append(('zones', None))
+    return tasks
+
+
+def run_validation(processes=None):
+    """Run every task, in a pool of processes unless processes is 1.
+        Return the list of failures.
+    """
+    tasks = get_tasks()
+    if processes == 1:
+        results = [run_task(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(run_task, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    return [failure for result in results for failure in result]
+
+
+if __name__ == '__main__':
+    failures = run_validation(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    for failure in failures:
+        print failure
+    print '%d failures' % len(failures)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,50 @@
+"""Unit test case for PlanValidation"""
+
+import unittest
+
+import PaceTables
+from PlanValidation import *
+
+
+class TestPlanValidation(unittest.TestCase):
+    """Run the validation harness"""
+
+    def test_tasks(self):
+        """every plan length up to past the maximum is covered"""
+        numweeks = [argument for name, argument in get_tasks() if name == 'plan']
+        self.assertEqual(numweeks, list(range(0, DanielsTrainingPlan.max_weeks + 3)))
+
+    def test_validation(self):
+        """no invariant is broken, in process and in a pool"""
+        self.assertEqual(run_validation(1), [])
+        self.assertEqual(run_validation(2), [])
+
+    def test_detects_failures(self):
+        """a plan layout that moves weeks is reported"""
+        layout = DanielsTrainingPlan.get_phase_layout(12)
+        try:
+            DanielsTrainingPlan._layouts[12] = (layout[1], layout[0], layout[2], layout[3])
+            self.assertNotEqual(check_plan(12), [])
+        finally:
+            DanielsTrainingPlan._layouts[12] = layout
+
+    def test_detects_formula_drift(self):
+        """a pace or VDOT formula that drifts from the original expression is reported"""
+        for formulas, key, check in ((PACE_FORMULAS, PaceZone.threshold, check_paces),
+                                     (VDOT_FORMULAS, Distance.mile, check_vdot)):
+            formula = formulas[key]
+            coefficients = list(formula.coefficients)
+            coefficients[-1] += 1e-6
+            tables = dict(PaceTables._tables)
+            try:
+                formulas[key] = GuardedPolynomial(formula.name, coefficients, formula.lower, formula.upper)
+                self.assertNotEqual(check(key), [])
+            finally:
+                formulas[key] = formula
+                #drop the pace tables built from the drifted formula
+                PaceTables._tables.clear()
+                PaceTables._tables.update(tables)
+
+
+if __name__ == '__main__':
+    unittest.main()
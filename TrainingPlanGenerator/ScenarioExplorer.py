@@ -0,0 +1,114 @@
+"""
+ScenarioExplorer
+ Compares Daniels plan variants over a grid of plan lengths, vdots and
+ goal race distances without building or rendering the plans.
+ Every variant is summarized from the cached phase layout of its length
+ and the cached pace table of its vdot.
+"""
+import itertools
+
+from DanielsTrainingPlanGenerator import *
+from PaceTables import Unit, get_pace_table
+
+# Fraction of the weekly mileage run in each quality zone for each phase,
+# staying within the Daniels limits of about 5% R, 8% I and 10% T.
+# The remainder of every week is E.
+_TRACK_MIX = (
+    {},
+    {PaceZone.repetition: 0.05},
+    {PaceZone.interval: 0.08, PaceZone.repetition: 0.02},
+    {PaceZone.threshold: 0.06, PaceZone.interval: 0.04, PaceZone.repetition: 0.04},
+)
+_ROAD_MIX = (
+    {},
+    {PaceZone.repetition: 0.05},
+    {PaceZone.interval: 0.08, PaceZone.threshold: 0.04},
+    {PaceZone.threshold: 0.10, PaceZone.marathon: 0.10},
+)
+DEFAULT_ZONE_MIX = {
+    Distance.mile: _TRACK_MIX,
+    Distance.fiveK: _TRACK_MIX,
+    Distance.halfMarathon: _ROAD_MIX,
+}
+
+# weekly mileage of each phase as a fraction of the peak weekly mileage
+DEFAULT_PHASE_VOLUME = (0.8, 0.9, 1.0, 1.0)
+
+
+class ScenarioSummary(object):
+    """Summary of one plan variant.
+        phase_weeks holds the number of weeks of each phase, weekly_miles the
+        mileage of every week in plan order and zone_seconds the total time
+        spent in each PaceZone over the plan.
+    """
+
+    def __init__(self, numweeks, vdot, distance, phase_weeks, weekly_miles, zone_seconds):
+        self.numweeks = numweeks
+        self.vdot = vdot
+        self.distance = distance
+        self.phase_weeks = phase_weeks
+        self.weekly_miles = weekly_miles
+        self.zone_seconds = zone_seconds
+
+    def __repr__(self):
+        return 'Scenario(%d weeks, vdot %s, %s)' % (self.numweeks, self.vdot, self.distance)
+
+    def get_total_miles(self):
+        """Return the mileage of the whole plan"""
+        return sum(self.weekly_miles)
+
+    def get_total_seconds(self):
+        """Return the running time of the whole plan"""
+        return sum(self.zone_seconds.values())
+
+
+class ScenarioExplorer(object):
+    """Summarizes plan variants for a peak weekly mileage.
+        zone_mix maps a distance to the quality zone fractions of each phase
+        and phase_volume gives the weekly mileage of each phase relative to
+        peak_miles.
+    """
+
+    def __init__(self, peak_miles=40, zone_mix=None, phase_volume=DEFAULT_PHASE_VOLUME,
+                 policy=DomainPolicy.clamp):
+        self.peak_miles = peak_miles
+        self.zone_mix = zone_mix if zone_mix is not None else DEFAULT_ZONE_MIX
+        self.phase_volume = phase_volume
+        self.policy = policy
+        self.__phase_miles = {}
+
+    def get_phase_miles(self, distance):
+        """Return, for each phase, a dict of weekly miles per zone. Cached per distance"""
+        phase_miles = self.__phase_miles.get(distance)
+        if phase_miles is None:
+            if distance not in self.zone_mix:
+                raise TrainingGeneratorException('No zone mix for distance %r.' % (distance,))
+            phase_miles = []
+            for volume, mix in zip(self.phase_volume, self.zone_mix[distance]):
+                miles = self.peak_miles * volume
+                zones = dict((zone, miles * fraction) for zone, fraction in mix.items())
+                zones[PaceZone.easy] = miles - sum(zones.values())
+                phase_miles.append(zones)
+            self.__phase_miles[distance] = phase_miles
+        return phase_miles
+
+    def summarize(self, numweeks, vdot, distance):
+        """Return the ScenarioSummary of one variant"""
+        layout = DanielsTrainingPlan.get_phase_layout(numweeks)
+        table = get_pace_table(vdot, self.policy)
+        phase_weeks = tuple(len(weeknums) for weeknums in layout)
+        weekly_miles = []
+        zone_seconds = dict((zone, 0.0) for zone in PACE_FORMULAS)
+        for weeks, zones in zip(phase_weeks, self.get_phase_miles(distance)):
+            weekly_miles.extend([sum(zones.values())] * weeks)
+            for zone, miles in zones.items():
+                zone_seconds[zone] += weeks * miles * table.get_pace(zone, Unit.imperial)
+        return ScenarioSummary(numweeks, vdot, distance, phase_weeks, weekly_miles, zone_seconds)
+
+    def explore(self, numweeks_list, vdots, distances):
+        """Return a ScenarioSummary for every combination of the given
+            plan lengths, vdots and distances.
+            :rtype : list
+        """
+        return [self.summarize(numweeks, vdot, distance)
+                for numweeks, vdot, distance in itertools.product(numweeks_list, vdots, distances)]
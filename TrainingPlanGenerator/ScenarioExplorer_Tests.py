@@ -0,0 +1,48 @@
+"""Unit test case for ScenarioExplorer"""
+
+import unittest
+
+from PaceTables import METERS_PER_MILE
+from ScenarioExplorer import *
+
+
+class TestScenarioExplorer(unittest.TestCase):
+    """Test case for plan variant summaries"""
+
+    def setUp(self):
+        self.explorer = ScenarioExplorer(peak_miles=40)
+
+    def test_grid(self):
+        """one summary per combination, with the phase weeks of the real plan"""
+        summaries = self.explorer.explore((12, 16, 20, 24), (45, 50, 55), (Distance.fiveK, Distance.halfMarathon))
+        self.assertEqual(len(summaries), 24)
+        generator = DanielsTrainingPlanGenerator()
+        for summary in summaries:
+            plan = generator.generate_training_plan(summary.numweeks)
+            self.assertEqual(summary.phase_weeks, tuple(len(phase) for phase in plan.get_phases()))
+            self.assertEqual(len(summary.weekly_miles), summary.numweeks)
+
+    def test_foundation_only(self):
+        """a 3 week plan is all E at the foundation volume"""
+        summary = self.explorer.summarize(3, 50, Distance.fiveK)
+        self.assertEqual(summary.weekly_miles, [32.0] * 3)
+        self.assertAlmostEqual(summary.zone_seconds[PaceZone.easy], 96 * DanielsTrainingPlan.get_E_pace(50))
+        self.assertEqual(summary.get_total_seconds(), summary.zone_seconds[PaceZone.easy])
+
+    def test_zone_time(self):
+        """zone time follows the zone mix and pace of the variant"""
+        summary = self.explorer.summarize(24, 50, Distance.halfMarathon)
+        self.assertEqual(summary.get_total_miles(), 6 * (32 + 36 + 40 + 40))
+        self.assertAlmostEqual(summary.zone_seconds[PaceZone.marathon], 6 * 4 * DanielsTrainingPlan.get_MP_pace(50))
+        self.assertAlmostEqual(summary.zone_seconds[PaceZone.repetition],
+                               6 * 1.8 * DanielsTrainingPlan.get_R_pace(50) * METERS_PER_MILE / 400)
+        faster = self.explorer.summarize(24, 60, Distance.halfMarathon)
+        self.assertTrue(faster.get_total_seconds() < summary.get_total_seconds())
+
+    def test_unknown_distance(self):
+        """distances without a zone mix are rejected"""
+        self.assertRaises(TrainingGeneratorException, self.explorer.summarize, 12, 50, 'MARATHON')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+"""
+TrainingLog
+ Streams logged activities from CSV, JSON lines or GPX files and
+ reconciles them against a DanielsTrainingPlan to report per week
+ compliance and pace zone adherence.
+ Activities are read in fixed size chunks and only per week totals are
+ kept, so memory does not grow with the size of the log.
+"""
+import csv
+import datetime
+import json
+import math
+import os
+import re
+import xml.etree.cElementTree as ElementTree
+
+from DanielsTrainingPlanGenerator import *
+from PaceTables import METERS_PER_MILE, ZONE_METERS
+
+
+class ActivityFormatException(TrainingGeneratorException):
+    """Exception thrown when an activity file can't be read"""
+
+
+class Activity(object):
+    """A logged run. distance is in meters, duration in seconds."""
+
+    __slots__ = ('date', 'distance', 'duration')
+
+    def __init__(self, date, distance, duration):
+        self.date = date
+        self.distance = distance
+        self.duration = duration
+
+    def __repr__(self):
+        return 'Activity(%s, %.0fm, %.0fs)' % (self.date, self.distance, self.duration)
+
+    def get_mile_pace(self):
+        """Return the pace in seconds per mile, or None for zero distance"""
+        if self.distance <= 0:
+            return None
+        return self.duration / (self.distance / METERS_PER_MILE)
+
+
+def parse_date(text):
+    """Return the date of an ISO 8601 date or timestamp string"""
+    try:
+        return datetime.datetime.strptime(text[:10], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ActivityFormatException('Invalid date %r.' % text)
+
+
+_TIMESTAMP = re.compile(r'(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.\d+)?(Z|[+-]\d\d:?\d\d)?$')
+
+
+def parse_timestamp(text):
+    """Return the (local, utc) datetimes of an ISO 8601 timestamp, without
+        tzinfo. local is the wall clock time at the UTC offset of the
+        timestamp. Timestamps ending in Z or without an offset are UTC.
+    """
+    match = _TIMESTAMP.match(text.strip())
+    if match is None:
+        raise ValueError('Invalid timestamp %r.' % text)
+    local = datetime.datetime.strptime(match.group(1), '%Y-%m-%dT%H:%M:%S')
+    offset = match.group(2)
+    if offset is None or offset == 'Z':
+        return local, local
+    delta = datetime.timedelta(hours=int(offset[1:3]), minutes=int(offset[-2:]))
+    if offset[0] == '-':
+        delta = -delta
+    return local, local - delta
+
+
+def activity_from_record(record):
+    """Return an Activity from a dict with date, distance and duration keys"""
+    try:
+        return Activity(parse_date(record['date']), float(record['distance']), float(record['duration']))
+    except (KeyError, ValueError, TypeError) as e:
+        raise ActivityFormatException('Invalid activity record %r: %s' % (record, e))
+
+
+def iter_csv_activities(path):
+    """Yield the activities of a CSV file with date, distance and duration columns"""
+    with open(path, 'rb') as csv_file:
+        reader = csv.DictReader(csv_file)
+        for record in reader:
+            try:
+                activity = activity_from_record(record)
+            except ActivityFormatException as e:
+                raise ActivityFormatException('%s line %d: %s' % (path, reader.line_num, e.message))
+            yield activity
+
+
+def iter_jsonl_activities(path):
+    """Yield the activities of a file with one JSON record per line"""
+    with open(path, 'rb') as jsonl_file:
+        for number, line in enumerate(jsonl_file, 1):
+            if line.strip():
+                try:
+                    activity = activity_from_record(json.loads(line))
+                except ValueError as e:
+                    raise ActivityFormatException('Invalid JSON in %s line %d: %s' % (path, number, e))
+                except ActivityFormatException as e:
+                    raise ActivityFormatException('%s line %d: %s' % (path, number, e.message))
+                yield activity
+
+
+def iter_gpx_activities(path):
+    """Yield an activity for every track of a GPX file. Distance is summed
+        between track points and duration is the time from first to last point.
+        The activity is dated by the wall clock time of its first point at the
+        UTC offset it was recorded with, so times in Z are dated in UTC.
+    """
+    points = []
+    for event, element in ElementTree.iterparse(path):
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'trkpt':
+            time = None
+            for child in element:
+                if child.tag.rsplit('}', 1)[-1] == 'time':
+                    time = child.text
+            if time is not None:
+                try:
+                    local, utc = parse_timestamp(time)
+                    points.append((float(element.get('lat')), float(element.get('lon')), local, utc))
+                except (ValueError, TypeError):
+                    raise ActivityFormatException('Invalid track point in %s.' % path)
+            element.clear()
+        elif tag == 'trkseg':
+            element.clear()
+        elif tag == 'trk':
+            if points:
+                distance = sum(haversine(a[0], a[1], b[0], b[1]) for a, b in zip(points, points[1:]))
+                duration = (points[-1][3] - points[0][3]).total_seconds()
+                yield Activity(points[0][2].date(), distance, duration)
+            points = []
+            element.clear()
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the distance in meters between two coordinates"""
+    lat1, lon1, lat2, lon2 = [math.radians(value) for value in (lat1, lon1, lat2, lon2)]
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371008.8 * math.asin(math.sqrt(a))
+
+
+_READERS = {
+    '.csv': iter_csv_activities,
+    '.jsonl': iter_jsonl_activities,
+    '.gpx': iter_gpx_activities,
+}
+
+
+def iter_activities(path):
+    """Yield the activities of a file, choosing the reader by extension"""
+    reader = _READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ActivityFormatException('Unsupported activity file %s.' % path)
+    return reader(path)
+
+
+def iter_activity_chunks(paths, chunk_size=1000):
+    """Yield lists of at most chunk_size activities read from paths in order"""
+    chunk = []
+    for path in paths:
+        for activity in iter_activities(path):
+            chunk.append(activity)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+###########################################################################
+
+class WeekCompliance(object):
+    """Totals for one week of a plan"""
+
+    def __init__(self, weekindex, planned_days):
+        self.weekindex = weekindex
+        self.planned_days = planned_days
+        self.completed_days = set()
+        self.activities = 0
+        self.distance = 0.0
+        self.zoned = 0
+        self.in_zone = 0
+
+    def __repr__(self):
+        return 'Week %i: %.0f%% compliance, %.0f%% in zone' % (
+            self.weekindex, self.get_compliance() * 100, self.get_adherence() * 100)
+
+    def get_compliance(self):
+        """Return the fraction of planned days with at least one activity"""
+        if self.planned_days == 0:
+            return 1.0
+        return float(len(self.completed_days)) / self.planned_days
+
+    def get_adherence(self):
+        """Return the fraction of activities on zoned days run within the zone band"""
+        if self.zoned == 0:
+            return 1.0
+        return float(self.in_zone) / self.zoned
+
+
+class PlanReconciler(object):
+    """Joins activities to the days of a DanielsTrainingPlan through its date
+        index. The plan needs a start_date, and a vdot for zone adherence.
+        A pace is in zone when it is within tolerance of the zone pace.
+        Weeks with their own pace targets are checked against those.
+    """
+
+    def __init__(self, plan, tolerance=0.05):
+        self.index = plan.get_date_index()
+        self.tolerance = tolerance
+        plan_bands = {}
+        if plan.vdot > 0:
+            plan_bands = self.get_bands(plan.paces or
+                                        dict((zone, plan.get_pace(zone, plan.vdot)) for zone in PACE_FORMULAS))
+        self.weeks = []
+        self.week_bands = []
+        for weekindex in range(len(plan)):
+            week = plan.get_week(weekindex)
+            planned = sum(1 for day in week.get_days() if day.get_workouts())
+            self.weeks.append(WeekCompliance(weekindex, planned))
+            paces = getattr(week, 'paces', None)
+            self.week_bands.append(self.get_bands(paces) if paces else plan_bands)
+        self.unmatched = 0
+
+    def get_bands(self, paces):
+        """Return a dict mapping zone to the (fast, slow) mile pace band of paces"""
+        bands = {}
+        for zone, pace in paces.items():
+            pace *= METERS_PER_MILE / ZONE_METERS[zone]
+            bands[zone] = (pace * (1 - self.tolerance), pace * (1 + self.tolerance))
+        return bands
+
+    def add_activities(self, activities):
+        """Add a chunk of activities to the weekly totals"""
+        for activity in activities:
+            entry = self.index.get(activity.date)
+            if entry is None:
+                self.unmatched += 1
+                continue
+            weekindex, day = entry
+            week = self.weeks[weekindex]
+            week.activities += 1
+            week.distance += activity.distance
+            if day is None or not day.get_workouts():
+                continue
+            week.completed_days.add(day.get_day_of_week())
+            band = self.get_band(day, self.week_bands[weekindex])
+            pace = activity.get_mile_pace()
+            if band is not None and pace is not None:
+                week.zoned += 1
+                if band[0] <= pace <= band[1]:
+                    week.in_zone += 1
+
+    def get_band(self, day, bands):
+        """Return the (fast, slow) mile pace band of the first zoned workout of the day"""
+        for workout in day.get_workouts():
+            zone = workout.get_zone() if hasattr(workout, 'get_zone') else None
+            if zone in bands:
+                return bands[zone]
+        return None
+
+
+def reconcile(plan, paths, chunk_size=1000, tolerance=0.05):
+    """Return the list of WeekCompliance of plan for the activity files in paths"""
+    reconciler = PlanReconciler(plan, tolerance)
+    for chunk in iter_activity_chunks(paths, chunk_size):
+        reconciler.add_activities(chunk)
+    return reconciler.weeks
@@ -0,0 +1,143 @@
+"""Unit test case for TrainingLog"""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from TrainingLog import *
+
+GPX = '''<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="45.0000" lon="-93.0000"><time>2015-03-03T07:00:00Z</time></trkpt>
+    <trkpt lat="45.0090" lon="-93.0000"><time>2015-03-03T07:05:00Z</time></trkpt>
+  </trkseg></trk>
+</gpx>
+'''
+
+
+class TestTrainingLog(unittest.TestCase):
+    """Test case for activity ingestion and plan reconciliation"""
+
+    def setUp(self):
+        """Setup a 3 week plan starting on a Monday with an E day and a T day each week"""
+        self.directory = tempfile.mkdtemp()
+        self.plan = DanielsTrainingPlanGenerator().generate_training_plan(3)
+        self.plan.start_date = datetime.date(2015, 3, 2)
+        self.plan.set_vdot(50)
+        for i in range(3):
+            week = self.plan.get_week(i)
+            for day_of_week, desc in ((1, 'E'), (3, '4 x 1 mile @ T')):
+                day = DanielsTrainingDay(day_of_week)
+                workout = DanielsTrainingWorkout()
+                workout.desc = desc
+                day.add_workout(workout)
+                week.add_day(day)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        """write a file in the test directory and return its path"""
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_date_index(self):
+        """dates map to plan weeks and days"""
+        index = self.plan.get_date_index()
+        self.assertEqual(len(index), 21)
+        weekindex, day = index[datetime.date(2015, 3, 11)]
+        self.assertEqual(weekindex, 1)
+        self.assertEqual(day.get_day_of_week(), 3)
+        self.assertEqual(index[datetime.date(2015, 3, 12)], (1, None))
+        self.assertNotIn(datetime.date(2015, 3, 23), index)
+
+    def test_workout_zone(self):
+        """zones are read from the end of the workout description"""
+        workout = DanielsTrainingWorkout()
+        workout.desc = '2 x 5 min @ T'
+        self.assertEqual(workout.get_zone(), PaceZone.threshold)
+        workout.desc = 'E'
+        self.assertEqual(workout.get_zone(), PaceZone.easy)
+        workout.desc = 'rest'
+        self.assertIsNone(workout.get_zone())
+
+    def test_readers(self):
+        """each file format yields activities"""
+        csv_path = self.write('log.csv', 'date,distance,duration\n2015-03-02,8046.72,2470\n')
+        jsonl_path = self.write('log.jsonl', '{"date": "2015-03-09T06:30:00", "distance": 1000, "duration": 300}\n\n')
+        gpx_path = self.write('log.gpx', GPX)
+        activities = [activity for chunk in iter_activity_chunks([csv_path, jsonl_path, gpx_path], 2)
+                      for activity in chunk]
+        self.assertEqual([activity.date.day for activity in activities], [2, 9, 3])
+        self.assertAlmostEqual(activities[2].distance, 1000.8, delta=1)
+        self.assertEqual(activities[2].duration, 300)
+        self.assertRaises(ActivityFormatException, iter_activities, 'log.txt')
+
+    def test_gpx_offsets(self):
+        """GPX activities are dated at the offset they were recorded with"""
+        gpx_path = self.write('late.gpx', GPX.replace('2015-03-03T07:00:00Z', '2015-03-03T23:58:00-06:00')
+                                             .replace('2015-03-03T07:05:00Z', '2015-03-04T06:03:00.5Z'))
+        activity, = iter_activities(gpx_path)
+        self.assertEqual(activity.date, datetime.date(2015, 3, 3))
+        self.assertEqual(activity.duration, 300)
+        self.assertEqual(parse_timestamp('2015-03-04T01:30:00+0530'),
+                         (datetime.datetime(2015, 3, 4, 1, 30), datetime.datetime(2015, 3, 3, 20, 0)))
+        self.assertRaises(ActivityFormatException, list, iter_activities(self.write('bad.gpx', GPX.replace('Z<', 'X<'))))
+
+    def test_malformed_csv(self):
+        """invalid CSV records are reported with the file and line number"""
+        path = self.write('bad.csv', 'date,distance,duration\n2015-03-02,8046.72,2470\n2015-03-03,far,2470\n')
+        try:
+            list(iter_activities(path))
+            self.fail('ActivityFormatException not raised')
+        except ActivityFormatException as e:
+            self.assertIn('%s line 3' % path, e.message)
+
+    def test_malformed_jsonl(self):
+        """malformed lines are reported with the file and line number"""
+        record = '{"date": "2015-03-09", "distance": 1000, "duration": 300}\n'
+        for name, bad_line in (('bad_json.jsonl', '{"date": \n'), ('bad_record.jsonl', '{"date": "2015-03-10"}\n')):
+            path = self.write(name, record + '\n' + bad_line)
+            try:
+                list(iter_activities(path))
+                self.fail('ActivityFormatException not raised')
+            except ActivityFormatException as e:
+                self.assertIn('%s line 3' % path, e.message)
+        self.assertRaises(ActivityFormatException, iter_activities, self.write('log.json', '[' + record + ']'))
+
+    def test_reconcile(self):
+        """activities count towards compliance and zone adherence"""
+        e_pace = DanielsTrainingPlan.get_E_pace(50)
+        t_pace = DanielsTrainingPlan.get_T_pace(50)
+        lines = ['date,distance,duration',
+                 #week 1: both days, E in zone, T too slow
+                 '2015-03-02,%f,%f' % (METERS_PER_MILE * 5, e_pace * 5),
+                 '2015-03-04,%f,%f' % (METERS_PER_MILE * 4, e_pace * 4),
+                 #week 2: T day only, in zone, plus an unplanned day
+                 '2015-03-11,%f,%f' % (METERS_PER_MILE * 4, t_pace * 4),
+                 '2015-03-12,%f,%f' % (METERS_PER_MILE * 3, e_pace * 3),
+                 #after the plan
+                 '2015-04-01,1000,300']
+        path = self.write('log.csv', '\n'.join(lines) + '\n')
+        weeks = reconcile(self.plan, [path], chunk_size=2)
+        self.assertEqual(len(weeks), 3)
+        self.assertEqual(weeks[0].get_compliance(), 1.0)
+        self.assertEqual(weeks[0].get_adherence(), 0.5)
+        self.assertEqual(weeks[1].get_compliance(), 0.5)
+        self.assertEqual(weeks[1].activities, 2)
+        self.assertEqual(weeks[1].get_adherence(), 1.0)
+        self.assertEqual(weeks[2].get_compliance(), 0.0)
+
+        #week targets take precedence over the plan paces
+        self.plan.get_week(1).set_vdot(60)
+        weeks = reconcile(self.plan, [path])
+        self.assertEqual(weeks[1].get_adherence(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+TrainingPlanCLI
+ Command line entry point generating Daniels training plans.
+ With --profile, writes a self contained report of per stage wall time and
+ allocations plus the top functions from cProfile, so slow batches can be
+ diagnosed offline.
+ Usage: python TrainingPlanCLI.py WEEKS [--vdot N | --race DISTANCE SECONDS]
+            [--count N] [--quiet] [--profile REPORT]
+"""
+import argparse
+import contextlib
+import cProfile
+import datetime
+import gc
+import platform
+import pstats
+import sys
+import timeit
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# DanielsTrainingPlanGenerator is imported by the functions using it, so
+# importing this module stays as cheap as importing the generator registry.
+
+STAGES = ('vdot estimation', 'add_weeks', 'pace assignment', 'rendering')
+
+
+class StageProfiler(object):
+    """Collects wall time and allocations per named stage and a cProfile of
+        the whole run. A disabled profiler only runs the stages.
+    """
+
+    def __init__(self, enabled=True, top=25):
+        self.enabled = enabled
+        self.top = top
+        self.stages = {}
+        self.profile = cProfile.Profile() if enabled else None
+        self.snapshot = None
+        self.allocation_unit = 'bytes' if tracemalloc is not None else 'objects'
+
+    def start(self):
+        """Start collecting"""
+        if self.enabled:
+            if tracemalloc is not None:
+                tracemalloc.start()
+            self.profile.enable()
+
+    def stop(self):
+        """Stop collecting"""
+        if self.enabled:
+            self.profile.disable()
+            if tracemalloc is not None:
+                self.snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+    def allocated(self):
+        """Return the current traced memory, or the number of gc tracked objects"""
+        if tracemalloc is not None:
+            return tracemalloc.get_traced_memory()[0]
+        return len(gc.get_objects())
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager timing the enclosed block as part of stage name"""
+        if not self.enabled:
+            yield
+            return
+        self.profile.disable()
+        allocated = self.allocated()
+        self.profile.enable()
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            elapsed = timeit.default_timer() - start
+            self.profile.disable()
+            totals = self.stages.setdefault(name, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] += self.allocated() - allocated
+            self.profile.enable()
+
+    def get_report(self, argv):
+        """Return the text report"""
+        lines = ['Training plan generation profile',
+                 'date:     %s' % datetime.datetime.now().isoformat(),
+                 'command:  %s' % ' '.join(argv),
+                 'python:   %s (%s)' % (platform.python_version(), platform.platform()),
+                 '',
+                 'Stages',
+                 '%-18s %8s %12s %12s %14s' % ('stage', 'calls', 'total ms', 'mean ms',
+                                               'alloc %s' % self.allocation_unit)]
+        for name in STAGES:
+            if name in self.stages:
+                calls, elapsed, allocated = self.stages[name]
+                lines.append('%-18s %8d %12.3f %12.3f %14d' % (
+                    name, calls, elapsed * 1e3, elapsed * 1e3 / calls, allocated))
+
+        stream = StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        stats.sort_stats('time').print_stats(self.top)
+        lines.extend(['', 'Top functions by cumulative and own time', stream.getvalue()])
+
+        if self.snapshot is not None:
+            lines.append('Top allocation sites')
+            for statistic in self.snapshot.statistics('lineno')[:self.top]:
+                lines.append(str(statistic))
+        return '\n'.join(lines) + '\n'
+
+
+def get_race_distances():
+    """Return the distances a --race result can be given for"""
+    from DanielsTrainingPlanGenerator import Distance
+    return Distance.mile, Distance.fiveK, Distance.halfMarathon
+
+
+def get_parser():
+    """Return the argument parser"""
+    parser = argparse.ArgumentParser(description='Generate Daniels training plans.')
+    parser.add_argument('weeks', type=int, help='number of weeks in the plan')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--vdot', type=float, help='VDOT of the athlete')
+    group.add_argument('--race', nargs=2, metavar=('DISTANCE', 'SECONDS'),
+                       help='race result to estimate VDOT from, distance is one of %s'
+                            % ', '.join(get_race_distances()))
+    parser.add_argument('--count', type=int, default=1, help='number of plans to generate')
+    parser.add_argument('--quiet', action='store_true', help='don\'t print the plans')
+    parser.add_argument('--profile', metavar='REPORT', help='write a profile report to REPORT')
+    return parser
+
+
+def parse_vdot(parser, vdot):
+    """Return the --vdot argument, exiting through parser.error if it is
+        outside the range of the pace formulas.
+    """
+    from DanielsTrainingPlanGenerator import DanielsTrainingPlan, DomainException, DomainPolicy, PACE_FORMULAS
+    try:
+        for zone in PACE_FORMULAS:
+            DanielsTrainingPlan.get_pace(zone, vdot, DomainPolicy.error)
+    except DomainException as e:
+        parser.error('argument --vdot: %s' % e.message)
+    return vdot
+
+
+def parse_race(parser, distance, seconds):
+    """Return the (distance, seconds) of a --race argument, exiting through
+        parser.error if the distance is unknown or the time is invalid or
+        outside the range of its VDOT formula.
+    """
+    from DanielsTrainingPlanGenerator import DanielsTrainingPlan, DomainException, DomainPolicy
+    # choices can't be given to the --race argument, it would apply to the seconds too
+    race_distances = get_race_distances()
+    if distance not in race_distances:
+        parser.error('argument --race: invalid distance %r (choose from %s)'
+                     % (distance, ', '.join(repr(choice) for choice in race_distances)))
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        parser.error('argument --race: invalid time %r' % seconds)
+    try:
+        DanielsTrainingPlan.estimate_vdot(distance, seconds, DomainPolicy.error)
+    except DomainException as e:
+        parser.error('argument --race: %s' % e.message)
+    return distance, seconds
+
+
+def main(argv=None, out=sys.stdout):
+    """Run the command line and return the exit code"""
+    from DanielsTrainingPlanGenerator import DanielsTrainingPlan, DanielsTrainingPlanGenerator, DomainPolicy
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    race = None
+    if args.vdot is not None:
+        parse_vdot(parser, args.vdot)
+    if args.race is not None:
+        race = parse_race(parser, *args.race)
+    profiler = StageProfiler(args.profile is not None)
+    generator = DanielsTrainingPlanGenerator()
+
+    profiler.start()
+    try:
+        for _ in range(args.count):
+            vdot = args.vdot
+            if race is not None:
+                with profiler.stage('vdot estimation'):
+                    vdot = DanielsTrainingPlan.estimate_vdot(race[0], race[1], DomainPolicy.error)
+            with profiler.stage('add_weeks'):
+                plan = generator.generate_training_plan(args.weeks)
+            if vdot is not None:
+                with profiler.stage('pace assignment'):
+                    plan.set_vdot(vdot)
+            with profiler.stage('rendering'):
+                text = plan.get_pretty_print()
+            if not args.quiet:
+                out.write(text + '\n')
+    finally:
+        profiler.stop()
+
+    if args.profile is not None:
+        with open(args.profile, 'w') as report:
+            report.write(profiler.get_report([sys.argv[0]] + list(argv)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Unit test case for TrainingPlanCLI"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from DanielsTrainingPlanGenerator import Distance
+from TrainingPlanCLI import *
+
+
+class TestTrainingPlanCLI(unittest.TestCase):
+    """Test case for the plan generation command line"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate(self):
+        """plans are rendered to the output"""
+        out = StringIO()
+        self.assertEqual(main(['6', '--vdot', '50', '--count', '2'], out), 0)
+        self.assertEqual(out.getvalue().count('6 week plan:'), 2)
+
+    def test_profile(self):
+        """the profile report lists every stage and the top functions"""
+        path = os.path.join(self.directory, 'report.txt')
+        out = StringIO()
+        self.assertEqual(main(['12', '--race', Distance.fiveK, '1138', '--count', '3',
+                               '--quiet', '--profile', path], out), 0)
+        self.assertEqual(out.getvalue(), '')
+        with open(path) as report:
+            text = report.read()
+        for name in STAGES:
+            self.assertIn('\n%-18s        3 ' % name, text)
+        self.assertIn('generate_training_plan', text)
+
+    def test_invalid_race(self):
+        """unknown distances and times outside the formula range are rejected"""
+        for race in (['10K', '2400'], [Distance.fiveK, 'fast'], [Distance.mile, '100']):
+            stderr = sys.stderr
+            sys.stderr = StringIO()
+            try:
+                self.assertRaises(SystemExit, main, ['12', '--race'] + race, StringIO())
+                self.assertIn('argument --race:', sys.stderr.getvalue())
+            finally:
+                sys.stderr = stderr
+
+    def test_invalid_vdot(self):
+        """a vdot outside the range of the pace formulas is rejected"""
+        for vdot in ('20', '90'):
+            stderr = sys.stderr
+            sys.stderr = StringIO()
+            try:
+                self.assertRaises(SystemExit, main, ['12', '--vdot', vdot], StringIO())
+                self.assertIn('argument --vdot:', sys.stderr.getvalue())
+            finally:
+                sys.stderr = stderr
+
+    def test_lazy_import(self):
+        """importing the command line doesn't load the Daniels generator"""
+        code = 'import sys, TrainingPlanCLI; sys.exit("DanielsTrainingPlanGenerator" in sys.modules)'
+        directory = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual(subprocess.call([sys.executable, '-c', code], cwd=directory), 0)
+
+    def test_stage_profiler_disabled(self):
+        """a disabled profiler records nothing"""
+        profiler = StageProfiler(False)
+        profiler.start()
+        with profiler.stage('add_weeks'):
+            pass
+        profiler.stop()
+        self.assertEqual(profiler.stages, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,360 @@
+"""
+TrainingPlanEncoder
+ Wire encoding of TrainingPlan objects as JSON or MessagePack.
+ Plans are streamed one phase at a time and can be limited to a range of
+ weeks, so the whole document never has to be built in memory.
+"""
+import json
+import struct
+
+from TrainingPlanGenerator import *
+
+SCHEMA_VERSION = 3
+
+
+class EncodingException(TrainingGeneratorException):
+    """Exception thrown when a wire document can't be encoded or decoded"""
+
+
+class PlanFactory(object):
+    """Creates the objects of a decoded plan. The default implementation
+        builds the base TrainingPlan classes with workouts left as strings.
+    """
+
+    def new_plan(self, plan_type, vdot, paces):
+        """Return an empty plan for the plan type named in the document.
+            The base TrainingPlan has no vdot or pace targets, so they are
+            dropped.
+        """
+        return TrainingPlan()
+
+    def new_phase(self, plan, index, phasenum, desc):
+        """Return the phase to fill at index in the plan, adding it if needed"""
+        phase = TrainingPhase(phasenum)
+        phase.desc = desc
+        plan.add_phase(phase)
+        return phase
+
+    def new_week(self, weeknum, vdot, paces):
+        """Return an empty week. The base TrainingWeek has no vdot or pace
+            targets, so they are dropped.
+        """
+        week = TrainingWeek()
+        week.weeknum = weeknum
+        return week
+
+    def new_day(self, day_of_week):
+        """Return an empty day"""
+        return TrainingDay(day_of_week)
+
+    def new_workout(self, desc):
+        """Return a workout from its description"""
+        return desc
+
+    def finish_plan(self, plan):
+        """Called once the plan is fully decoded"""
+        pass
+
+
+###########################################################################
+# Plan layout shared by both encodings.
+# Compact form is positional:
+#   plan    [version, type, total_weeks, start_week, vdot, {zone: pace}, [phase, ...]]
+#   phase   [phasenum, desc, [week, ...]]
+#   week    [weeknum, vdot, {zone: pace}, [day, ...]]
+#   day     [day_of_week, [workout desc, ...]]
+
+def workout_desc(workout):
+    """Return the wire description of a workout"""
+    return getattr(workout, 'desc', workout)
+
+
+def node_targets(node):
+    """Return the (vdot, paces) targets of a plan or week, (-1, {}) if it has none"""
+    return getattr(node, 'vdot', -1), getattr(node, 'paces', {})
+
+
+def decode_paces(paces):
+    """Return decoded paces keyed by native strings"""
+    return dict((native_string(zone), pace) for zone, pace in paces.items())
+
+
+def plan_week_ranges(plan, start_week=0, stop_week=None):
+    """Yield (phase, weeks) for every phase of the plan, keeping only the
+        weeks whose plan index is in [start_week, stop_week).
+    """
+    if stop_week is None:
+        stop_week = len(plan)
+    first = 0
+    for phase in plan.get_phases():
+        weeks = phase.get_weeks()
+        last = first + len(weeks)
+        yield phase, weeks[max(start_week - first, 0):max(min(stop_week, last) - first, 0)]
+        first = last
+
+
+def week_to_list(week):
+    """Return the compact form of a week"""
+    vdot, paces = node_targets(week)
+    return [week.weeknum, vdot, paces,
+            [[day.get_day_of_week(), [workout_desc(workout) for workout in day.get_workouts()]]
+             for day in week.get_days()]]
+
+
+def week_to_dict(week):
+    """Return the keyed form of a week"""
+    vdot, paces = node_targets(week)
+    return {'weeknum': week.weeknum,
+            'vdot': vdot,
+            'paces': paces,
+            'days': [{'day': day.get_day_of_week(),
+                      'workouts': [workout_desc(workout) for workout in day.get_workouts()]}
+                     for day in week.get_days()]}
+
+
+def phase_to_list(phase, weeks):
+    """Return the compact form of a phase containing weeks"""
+    return [phase.phasenum, phase.desc, [week_to_list(week) for week in weeks]]
+
+
+def phase_to_dict(phase, weeks):
+    """Return the keyed form of a phase containing weeks"""
+    return {'phasenum': phase.phasenum,
+            'desc': phase.desc,
+            'weeks': [week_to_dict(week) for week in weeks]}
+
+
+def plan_from_lists(version, plan_type, vdot, paces, phases, factory):
+    """Build a plan from decoded compact phases"""
+    if version != SCHEMA_VERSION:
+        raise EncodingException('Unsupported schema version %r.' % version)
+    if factory is None:
+        factory = PlanFactory()
+    plan = factory.new_plan(native_string(plan_type), vdot, decode_paces(paces))
+    for index, (phasenum, desc, weeks) in enumerate(phases):
+        phase = factory.new_phase(plan, index, phasenum, native_string(desc))
+        for weeknum, vdot, paces, days in weeks:
+            week = factory.new_week(weeknum, vdot, decode_paces(paces))
+            for day_of_week, workouts in days:
+                day = factory.new_day(day_of_week)
+                for desc in workouts:
+                    day.add_workout(factory.new_workout(native_string(desc)))
+                week.add_day(day)
+            phase.add_week(week)
+    factory.finish_plan(plan)
+    return plan
+
+
+def native_string(text):
+    """Return text as a native str where possible so decoded plans compare
+        and hash like freshly generated ones.
+    """
+    if isinstance(text, str):
+        return text
+    try:
+        return str(text)
+    except UnicodeEncodeError:
+        return text
+
+
+###########################################################################
+# JSON
+
+def iter_plan_json(plan, start_week=0, stop_week=None):
+    """Yield a JSON document for the plan one phase at a time.
+        Only weeks with a plan index in [start_week, stop_week) are included.
+    """
+    vdot, paces = node_targets(plan)
+    yield '{"version": %d, "type": %s, "total_weeks": %d, "start_week": %d, "vdot": %s, "paces": %s, ' \
+          '"phases": [' % (SCHEMA_VERSION, json.dumps(type(plan).__name__), len(plan), start_week,
+                           json.dumps(vdot), json.dumps(paces, sort_keys=True))
+    separator = ''
+    for phase, weeks in plan_week_ranges(plan, start_week, stop_week):
+        yield separator + json.dumps(phase_to_dict(phase, weeks), sort_keys=True)
+        separator = ', '
+    yield ']}'
+
+
+def encode_plan_json(plan, start_week=0, stop_week=None):
+    """Return the plan as a JSON string"""
+    return ''.join(iter_plan_json(plan, start_week, stop_week))
+
+
+def decode_plan_json(text, factory=None):
+    """Build a plan from a JSON document. factory is a PlanFactory"""
+    try:
+        document = json.loads(text)
+        phases = [(phase['phasenum'], phase['desc'],
+                   [(week['weeknum'], week['vdot'], week['paces'],
+                     [(day['day'], day['workouts']) for day in week['days']])
+                    for week in phase['weeks']])
+                  for phase in document['phases']]
+        return plan_from_lists(document['version'], document['type'], document['vdot'], document['paces'],
+                               phases, factory)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise EncodingException('Malformed plan document: %r' % e)
+
+
+###########################################################################
+# MessagePack
+
+def iter_plan_msgpack(plan, start_week=0, stop_week=None):
+    """Yield a compact MessagePack document for the plan one phase at a time.
+        Only weeks with a plan index in [start_week, stop_week) are included.
+    """
+    vdot, paces = node_targets(plan)
+    yield (pack_array_header(7) + pack(SCHEMA_VERSION) + pack(type(plan).__name__) +
+           pack(len(plan)) + pack(start_week) + pack(vdot) + pack(paces) +
+           pack_array_header(len(plan.get_phases())))
+    for phase, weeks in plan_week_ranges(plan, start_week, stop_week):
+        yield pack(phase_to_list(phase, weeks))
+
+
+def encode_plan_msgpack(plan, start_week=0, stop_week=None):
+    """Return the plan as MessagePack bytes"""
+    return b''.join(iter_plan_msgpack(plan, start_week, stop_week))
+
+
+def decode_plan_msgpack(data, factory=None):
+    """Build a plan from a MessagePack document. factory is a PlanFactory"""
+    try:
+        document = unpack(data)
+        version, plan_type, total_weeks, start_week, vdot, paces, phases = document
+        return plan_from_lists(version, plan_type, vdot, paces, phases, factory)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise EncodingException('Malformed plan document: %r' % e)
+
+
+def pack_array_header(length):
+    """Return the MessagePack header for an array of length items"""
+    if length < 16:
+        return struct.pack('>B', 0x90 | length)
+    if length < 0x10000:
+        return struct.pack('>BH', 0xdc, length)
+    return struct.pack('>BI', 0xdd, length)
+
+
+def pack(obj):
+    """Return obj packed as MessagePack. Supports None, bool, int, float,
+        strings, lists, tuples and dicts.
+    """
+    if obj is None:
+        return b'\xc0'
+    if obj is True:
+        return b'\xc3'
+    if obj is False:
+        return b'\xc2'
+    if isinstance(obj, (int, long)):
+        if 0 <= obj < 0x80:
+            return struct.pack('>B', obj)
+        if -32 <= obj < 0:
+            return struct.pack('>b', obj)
+        if 0 <= obj < 0x10000:
+            return struct.pack('>BH', 0xcd, obj)
+        if 0 <= obj < 0x100000000:
+            return struct.pack('>BI', 0xce, obj)
+        if 0 <= obj < 0x10000000000000000:
+            return struct.pack('>BQ', 0xcf, obj)
+        if -0x8000 <= obj < 0:
+            return struct.pack('>Bh', 0xd1, obj)
+        if -0x80000000 <= obj < 0:
+            return struct.pack('>Bi', 0xd2, obj)
+        if -0x8000000000000000 <= obj < 0:
+            return struct.pack('>Bq', 0xd3, obj)
+        raise EncodingException('Integer %r is too large to encode.' % obj)
+    if isinstance(obj, float):
+        return struct.pack('>Bd', 0xcb, obj)
+    if isinstance(obj, (bytes, unicode)):
+        if isinstance(obj, unicode):
+            obj = obj.encode('utf-8')
+        length = len(obj)
+        if length < 32:
+            return struct.pack('>B', 0xa0 | length) + obj
+        if length < 0x100:
+            return struct.pack('>BB', 0xd9, length) + obj
+        if length < 0x10000:
+            return struct.pack('>BH', 0xda, length) + obj
+        return struct.pack('>BI', 0xdb, length) + obj
+    if isinstance(obj, (list, tuple)):
+        return pack_array_header(len(obj)) + b''.join(pack(item) for item in obj)
+    if isinstance(obj, dict):
+        length = len(obj)
+        if length < 16:
+            header = struct.pack('>B', 0x80 | length)
+        elif length < 0x10000:
+            header = struct.pack('>BH', 0xde, length)
+        else:
+            header = struct.pack('>BI', 0xdf, length)
+        return header + b''.join(pack(key) + pack(value) for key, value in obj.items())
+    raise EncodingException('Can\'t encode %s.' % type(obj).__name__)
+
+
+def unpack(data):
+    """Return the object packed in MessagePack data"""
+    obj, offset = _unpack_from(data, 0)
+    if offset != len(data):
+        raise EncodingException('Trailing data after MessagePack object.')
+    return obj
+
+
+_FIXED_FORMATS = {
+    0xca: '>f', 0xcb: '>d',
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+}
+
+_LENGTH_FORMATS = {
+    0xd9: ('>B', 'str'), 0xda: ('>H', 'str'), 0xdb: ('>I', 'str'),
+    0xdc: ('>H', 'array'), 0xdd: ('>I', 'array'),
+    0xde: ('>H', 'map'), 0xdf: ('>I', 'map'),
+}
+
+
+def _unpack_from(data, offset):
+    """Return (object, offset after the object) for the object at offset"""
+    try:
+        code = struct.unpack_from('>B', data, offset)[0]
+        offset += 1
+        if code < 0x80:
+            return code, offset
+        if code >= 0xe0:
+            return code - 0x100, offset
+        if code == 0xc0:
+            return None, offset
+        if code == 0xc2:
+            return False, offset
+        if code == 0xc3:
+            return True, offset
+        if code in _FIXED_FORMATS:
+            fmt = _FIXED_FORMATS[code]
+            return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+        if 0xa0 <= code <= 0xbf:
+            kind, length = 'str', code & 0x1f
+        elif 0x90 <= code <= 0x9f:
+            kind, length = 'array', code & 0x0f
+        elif 0x80 <= code <= 0x8f:
+            kind, length = 'map', code & 0x0f
+        elif code in _LENGTH_FORMATS:
+            fmt, kind = _LENGTH_FORMATS[code]
+            length = struct.unpack_from(fmt, data, offset)[0]
+            offset += struct.calcsize(fmt)
+        else:
+            raise EncodingException('Unsupported MessagePack type 0x%02x.' % code)
+    except struct.error as e:
+        raise EncodingException('Truncated MessagePack data: %s' % e)
+
+    if kind == 'str':
+        if offset + length > len(data):
+            raise EncodingException('Truncated MessagePack data.')
+        return data[offset:offset + length].decode('utf-8'), offset + length
+    if kind == 'array':
+        items = []
+        for _ in range(length):
+            item, offset = _unpack_from(data, offset)
+            items.append(item)
+        return items, offset
+    ret = {}
+    for _ in range(length):
+        key, offset = _unpack_from(data, offset)
+        ret[key], offset = _unpack_from(data, offset)
+    return ret, offset
@@ -0,0 +1,93 @@
+"""Unit test case for TrainingPlanEncoder"""
+
+import unittest
+
+from DanielsTrainingPlanGenerator import *
+from TrainingPlanEncoder import *
+
+
+class TestPlanEncoding(unittest.TestCase):
+    """Test case for plan wire encoding"""
+
+    def setUp(self):
+        """Setup a 12 week Daniels plan with one workout day per week"""
+        self.plan = DanielsTrainingPlanGenerator().generate_training_plan(12)
+        for i in range(len(self.plan)):
+            day = DanielsTrainingDay(i % 7 + 1)
+            workout = DanielsTrainingWorkout()
+            workout.desc = '%d x 5 min @ T' % (i + 1)
+            day.add_workout(workout)
+            self.plan.get_week(i).add_day(day)
+
+    def test_json_round_trip(self):
+        """decoding an encoded plan gives the same structure"""
+        plan = decode_plan_json(encode_plan_json(self.plan), DanielsPlanFactory())
+        self.assertEqual(self.plan.structural_hash(), plan.structural_hash())
+        self.assertEqual(plan.numweeks, 12)
+
+    def test_msgpack_round_trip(self):
+        """decoding an encoded plan gives the same structure"""
+        data = encode_plan_msgpack(self.plan)
+        self.assertTrue(len(data) < len(encode_plan_json(self.plan)))
+        plan = decode_plan_msgpack(data, DanielsPlanFactory())
+        self.assertEqual(self.plan.structural_hash(), plan.structural_hash())
+
+    def test_plan_targets(self):
+        """plan vdot and paces are encoded"""
+        self.plan.set_vdot(56)
+        for encode, decode in ((encode_plan_json, decode_plan_json),
+                               (encode_plan_msgpack, decode_plan_msgpack)):
+            plan = decode(encode(self.plan), DanielsPlanFactory())
+            self.assertEqual(plan.vdot, 56)
+            self.assertEqual(plan.paces, self.plan.paces)
+            self.assertEqual(self.plan.structural_hash(), plan.structural_hash())
+
+    def test_streaming(self):
+        """a header chunk, one chunk per phase and, for JSON, a closing chunk"""
+        self.assertEqual(len(list(iter_plan_msgpack(self.plan))), 5)
+        self.assertEqual(len(list(iter_plan_json(self.plan))), 6)
+
+    def test_partial_plan(self):
+        """only the requested weeks are encoded"""
+        for encode, decode in ((encode_plan_json, decode_plan_json),
+                               (encode_plan_msgpack, decode_plan_msgpack)):
+            plan = decode(encode(self.plan, 4, 8), DanielsPlanFactory())
+            self.assertEqual(len(plan), 4)
+            self.assertEqual(len(plan.get_phases()), 4)
+            for i in range(4):
+                self.assertEqual(plan.get_week(i).structural_hash(),
+                                 self.plan.get_week(i + 4).structural_hash())
+
+    def test_default_factory(self):
+        """the default factory builds base classes with string workouts"""
+        plan = decode_plan_json(encode_plan_json(self.plan))
+        self.assertEqual(type(plan), TrainingPlan)
+        self.assertEqual(len(plan), 12)
+        self.assertEqual(plan.get_week(0).get_days()[0].get_workouts(), ['1 x 5 min @ T'])
+
+    def test_schema_version(self):
+        """unknown schema versions are rejected"""
+        text = encode_plan_json(self.plan).replace('"version": %d' % SCHEMA_VERSION, '"version": 99')
+        self.assertRaises(EncodingException, decode_plan_json, text)
+
+    def test_malformed_documents(self):
+        """malformed documents raise EncodingException"""
+        for text in ('not json', '[]', '{"version": %d}' % SCHEMA_VERSION,
+                     encode_plan_json(self.plan).replace('"paces": {}', '"paces": []', 1)):
+            self.assertRaises(EncodingException, decode_plan_json, text, DanielsPlanFactory())
+        for data in (b'\xa2\xff\xfe', b'\x92\x01', pack([1, 2]), b'\xc1'):
+            self.assertRaises(EncodingException, decode_plan_msgpack, data, DanielsPlanFactory())
+
+    def test_pack_values(self):
+        """msgpack values round trip"""
+        values = [None, True, False, 0, 127, 128, 70000, 2 ** 40, -1, -33, -40000, -2 ** 40,
+                  1.5, '', 'E', 'x' * 40, 'x' * 300, list(range(20)), {'a': [1, 2]}]
+        for value in values:
+            self.assertEqual(unpack(pack(value)), value)
+        self.assertEqual(pack(1), b'\x01')
+        self.assertEqual(pack([1, 'E']), b'\x92\x01\xa1E')
+        self.assertRaises(EncodingException, unpack, b'\x92\x01')
+
+
+if __name__ == '__main__':
+    unittest.main()
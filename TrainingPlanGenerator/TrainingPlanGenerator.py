@@ -2,6 +2,8 @@
 TrainingPlanGenerator
  Defines an api for implementing specific training plan generation tools.
 """
+import hashlib
+import importlib
 
 
 class TrainingPlanGenerator(object):
@@ -14,9 +16,184 @@ class TrainingPlanGenerator(object):
         raise NotImplementedError("Method not implemented")
 
 
+_generator_paths = {}
+_generator_classes = {}
+
+
+def register_generator(name, generator):
+    """Register a TrainingPlanGenerator under name. generator is either the
+        class itself or a 'module:ClassName' string, in which case the module
+        is not imported until the generator is first used.
+    """
+    _generator_classes.pop(name, None)
+    if isinstance(generator, type):
+        _generator_paths.pop(name, None)
+        _generator_classes[name] = generator
+    else:
+        _generator_paths[name] = generator
+
+
+def get_generator_names():
+    """Return the sorted list of registered generator names"""
+    return sorted(set(_generator_paths) | set(_generator_classes))
+
+
+def get_generator_class(name):
+    """Return the generator class registered under name, importing its
+        module on first use.
+    """
+    generator = _generator_classes.get(name)
+    if generator is None:
+        if name not in _generator_paths:
+            raise GeneratorNotFoundException('No training plan generator named %r.' % name)
+        module_name, _, class_name = _generator_paths[name].partition(':')
+        try:
+            generator = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise GeneratorNotFoundException('Can\'t load training plan generator %r: %s' % (name, e))
+        if not (isinstance(generator, type) and issubclass(generator, TrainingPlanGenerator)):
+            raise GeneratorNotFoundException('%r is not a TrainingPlanGenerator.' % _generator_paths[name])
+        _generator_classes[name] = generator
+    return generator
+
+
+def create_generator(name, *args, **kwargs):
+    """Return a new instance of the generator registered under name"""
+    return get_generator_class(name)(*args, **kwargs)
+
+
+register_generator('daniels', 'DanielsTrainingPlanGenerator:DanielsTrainingPlanGenerator')
+
+
 ###########################################################################
 
-class TrainingPlan(object):
+class StructuralNode(object):
+    """Base class for nodes of the training plan tree.
+        Each node has a Merkle style structural hash built from its own
+        fields and the hashes of its children. The hash is cached and
+        invalidated, along with the hashes of its parents, when the node
+        is mutated through its methods or hashed attributes.
+        Hashed attributes are declared with hashed_property and listed in
+        hashed_attributes. Parents are linked to their children only when
+        their hash is computed and nothing is invalidated while no hash is
+        cached, so building a plan costs nothing extra.
+        Mutating a list or dict returned by a getter directly requires a call
+        to invalidate_structural_hash.
+    """
+
+    hashed_attributes = ()
+    _structural_hash = None
+    _structural_parents = ()
+
+    def get_structural_fields(self):
+        """Return a tuple of the values that identify this node, excluding children"""
+        return tuple(_hashable(getattr(self, name)) for name in self.hashed_attributes)
+
+    def get_structural_children(self):
+        """Return the list of child nodes"""
+        return []
+
+    def structural_hash(self):
+        """Return the hex digest of this node and all its children"""
+        digest = self._structural_hash
+        if digest is None:
+            children = []
+            for child in self.get_structural_children():
+                if isinstance(child, StructuralNode):
+                    child.link_parent(self)
+                children.append(node_digest(child))
+            content = (type(self).__name__, self.get_structural_fields(), tuple(children))
+            digest = hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
+            self._structural_hash = digest
+        return digest
+
+    def link_parent(self, parent):
+        """Record parent so it is invalidated along with this node"""
+        parents = self._structural_parents
+        if not any(node is parent for node in parents):
+            self._structural_parents = parents + (parent,)
+
+    def invalidate_structural_hash(self):
+        """Clear the cached hash of this node and of every node containing it"""
+        if self._structural_hash is None:
+            # parents can only have a cached hash if this node has one
+            return
+        self._structural_hash = None
+        for parent in self._structural_parents:
+            parent.invalidate_structural_hash()
+
+
+def hashed_property(name, default=None):
+    """Return a property for a hashed attribute of a StructuralNode.
+        The value is stored as _hashed_<name>, which constructors may set
+        directly, and is default until set. Setting the property
+        invalidates the structural hash.
+    """
+    key = '_hashed_' + name
+
+    def getter(self):
+        return self.__dict__.get(key, default)
+
+    def setter(self, value):
+        self.__dict__[key] = value
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
+
+    return property(getter, setter)
+
+
+def _hashable(value):
+    """Return value with dicts replaced by sorted item tuples so equal values repr the same"""
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    return value
+
+
+def node_digest(node):
+    """Return the structural hash of node. Non StructuralNode objects are
+        hashed by their repr.
+    """
+    if isinstance(node, StructuralNode):
+        return node.structural_hash()
+    return hashlib.sha1(repr(node).encode('utf-8')).hexdigest()
+
+
+def diff_plans(old, new):
+    """Return a list of (path, old_node, new_node) tuples for the nodes that
+        differ between two plans. path is the tuple of child indexes leading
+        to the node. Added or removed nodes are paired with None.
+        A node whose own fields changed is reported and its children are
+        still compared. Subtrees with equal structural hashes are skipped
+        without being visited.
+    """
+    changes = []
+    _diff_nodes(old, new, (), changes)
+    return changes
+
+
+def _diff_nodes(old, new, path, changes):
+    """Recursive helper for diff_plans"""
+    if node_digest(old) == node_digest(new):
+        return
+    if not (isinstance(old, StructuralNode) and isinstance(new, StructuralNode)) or type(old) is not type(new):
+        changes.append((path, old, new))
+        return
+    if old.get_structural_fields() != new.get_structural_fields():
+        changes.append((path, old, new))
+    old_children = old.get_structural_children()
+    new_children = new.get_structural_children()
+    for index in range(max(len(old_children), len(new_children))):
+        if index >= len(new_children):
+            changes.append((path + (index,), old_children[index], None))
+        elif index >= len(old_children):
+            changes.append((path + (index,), None, new_children[index]))
+        else:
+            _diff_nodes(old_children[index], new_children[index], path + (index,), changes)
+
+
+###########################################################################
+
+class TrainingPlan(StructuralNode):
     """Abstract class. Defines a training plan divided into
         TrainingPhase objects
     """
@@ -54,11 +231,15 @@ class TrainingPlan(object):
     def add_phase(self, phase):
         """Adds a phase to the plan"""
         self.__phaseList.append(phase)
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
 
     def get_phases(self):
         """return list of phases"""
         return self.__phaseList
 
+    def get_structural_children(self):
+        return self.__phaseList
 
     def get_pretty_print(self):
         ret = '%i week plan:' % len(self)
@@ -69,16 +250,20 @@ class TrainingPlan(object):
 
 ###########################################################################
 
-class TrainingPhase(object):
+class TrainingPhase(StructuralNode):
     """Abstract class. Defines a phase of a training plan.
     """
 
+    hashed_attributes = ('phasenum', 'desc')
+    phasenum = hashed_property('phasenum')
+    desc = hashed_property('desc')
+
     def __init__(self, phasenum):
         """TrainingPhase constructor"""
         if phasenum < 1:
             raise PhaseNumberException('Phase number can\'t be less than 1.')
-        self.phasenum = phasenum
-        self.desc = ''
+        self._hashed_phasenum = phasenum
+        self._hashed_desc = ''
         self.__weeks = []
 
     def __len__(self):
@@ -97,15 +282,22 @@ class TrainingPhase(object):
     def add_week(self, week):
         """add a week to this phase"""
         self.__weeks.append(week)
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
 
     def extend_weeks(self, weeks):
         """Extend the weeks list with the weeks listed in weeks"""
         self.__weeks.extend(weeks)
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
 
     def get_weeks(self):
         """return the list of weeks"""
         return self.__weeks
 
+    def get_structural_children(self):
+        return self.__weeks
+
     def get_pretty_print(self, tabs):
         ret = 'Phase %i:' % self.phasenum
         for week in self.get_weeks():
@@ -115,14 +307,29 @@ class TrainingPhase(object):
 
 ###########################################################################
 
-class TrainingWeek(object):
+class TrainingWeek(StructuralNode):
     """Defines a week of training. Includes a collection of days."""
 
+    hashed_attributes = ('weeknum',)
+    weeknum = hashed_property('weeknum')
+
     def __init__(self):
         """TrainingWeek constructor"""
         self.__days = []
-        self.weeknum = 0
+        self._hashed_weeknum = 0
+
+    def add_day(self, day):
+        """add a day to this week"""
+        self.__days.append(day)
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
 
+    def get_days(self):
+        """return the list of days"""
+        return self.__days
+
+    def get_structural_children(self):
+        return self.__days
 
     def get_pretty_print(self, tabs):
         ret = '\t' * tabs
@@ -134,7 +341,7 @@ class TrainingWeek(object):
 
 ###########################################################################
 
-class TrainingDay(object):
+class TrainingDay(StructuralNode):
     """Defines a single day of training. Can contain multiple workouts"""
 
     def __init__(self, day_of_week=1):
@@ -159,11 +366,19 @@ class TrainingDay(object):
     def add_workout(self, workout):
         """Adds a workout to the list"""
         self.__workouts.append(workout)
+        if self._structural_hash is not None:
+            self.invalidate_structural_hash()
 
     def get_workouts(self):
         """return the list of workouts"""
         return self.__workouts
 
+    def get_structural_children(self):
+        return self.__workouts
+
+    def get_structural_fields(self):
+        return (self.__day_of_week,)
+
     def get_pretty_print(self, tabs):
         """return string for printing human readable day"""
         ret = '\t' * tabs
@@ -185,6 +400,7 @@ class TrainingDay(object):
         """
         if 0 < day_of_week < 8:
             self.__day_of_week = day_of_week
+            self.invalidate_structural_hash()
         else:
             raise DayOfWeekException('Invalid day specified. Must be an integer 1 through 7')
 
@@ -202,3 +418,11 @@ class DayOfWeekException(TrainingGeneratorException):
 
 class PhaseNumberException(TrainingGeneratorException):
     """Exception thrown when there is an issue with the phase number"""
+
+
+class GeneratorNotFoundException(TrainingGeneratorException):
+    """Exception thrown when a generator name can't be resolved"""
+
+
+class DomainException(TrainingGeneratorException):
+    """Exception thrown when a value is outside the valid range of a formula"""
@@ -0,0 +1,101 @@
+"""
+Benchmarks for the training plan generators.
+Run directly: python TrainingPlanGenerator_Benchmarks.py
+"""
+import subprocess
+import sys
+import timeit
+
+from DanielsTrainingPlanGenerator import *
+from LegacyFormulas import legacy_E_pace, legacy_I_pace, legacy_half_vdot
+
+
+def best_of(func, args, number=20000, repeat=3):
+    """Return the best per-call time in microseconds"""
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def report(name, baseline, current):
+    """print a single benchmark line"""
+    print '%-32s legacy %10.3f us   current %10.3f us   x%.1f' % (name, baseline, current, baseline / current)
+
+
+def bench_pace_evaluation():
+    """Compare the shared Horner evaluator against the expanded polynomials"""
+    report('E pace', best_of(legacy_E_pace, (56,)),
+           best_of(DanielsTrainingPlan.get_E_pace, (56,)))
+    report('E pace (clamped)', best_of(legacy_E_pace, (56,)),
+           best_of(DanielsTrainingPlan.get_E_pace, (56, DomainPolicy.clamp)))
+    report('E pace (unguarded evaluator)', best_of(legacy_E_pace, (56,)),
+           best_of(PACE_FORMULAS[PaceZone.easy].evaluate, (56,)))
+    report('I pace', best_of(legacy_I_pace, (56,)),
+           best_of(DanielsTrainingPlan.get_I_pace, (56,)))
+    report('Half marathon VDOT', best_of(legacy_half_vdot, (5224,)),
+           best_of(DanielsTrainingPlan.estimate_vdot, (Distance.halfMarathon, 5224)))
+
+
+def bench_group_generation(athletes=500, numweeks=24):
+    """Compare one group generation call against a call per athlete"""
+    vdots = [30 + i % 50 for i in range(athletes)]
+    generator = DanielsTrainingPlanGenerator()
+
+    def per_athlete():
+        for vdot in vdots:
+            generator.vdot = vdot
+            generator.generate_training_plan(numweeks)
+
+    report('%d athlete plans' % athletes, best_of(per_athlete, (), number=5),
+           best_of(generator.generate_group_training_plans, (numweeks, vdots), number=5))
+    report('%d athlete table' % athletes, best_of(per_athlete, (), number=5),
+           best_of(generator.generate_group_training_table, (numweeks, vdots), number=5))
+
+
+def bench_scenarios():
+    """Compare a scenario grid against generating and rendering every variant"""
+    from ScenarioExplorer import ScenarioExplorer
+    grid = ((12, 16, 20, 24), (40, 45, 50, 55, 60), (Distance.fiveK, Distance.halfMarathon))
+    generator = DanielsTrainingPlanGenerator()
+
+    def render_all():
+        for numweeks in grid[0]:
+            for vdot in grid[1]:
+                for distance in grid[2]:
+                    generator.vdot = vdot
+                    generator.generate_training_plan(numweeks).get_pretty_print()
+
+    def explore():
+        ScenarioExplorer().explore(*grid)
+
+    report('40 scenario grid', best_of(render_all, (), number=10), best_of(explore, (), number=10))
+
+
+def interpreter_time(statement, repeat=5):
+    """Return the best wall time in milliseconds of a fresh interpreter running statement"""
+    best = None
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        subprocess.check_call([sys.executable, '-c', statement])
+        elapsed = (timeit.default_timer() - start) * 1e3
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_cold_start():
+    """Measure interpreter startup with and without loading a generator"""
+    empty = interpreter_time('pass')
+    registry = interpreter_time('import sys, TrainingPlanGenerator; '
+                                'assert "DanielsTrainingPlanGenerator" not in sys.modules')
+    daniels = interpreter_time('import TrainingPlanGenerator; '
+                               'TrainingPlanGenerator.create_generator("daniels")')
+    print '%-32s %10.3f ms' % ('interpreter', empty)
+    print '%-32s %10.3f ms' % ('registry import', registry)
+    print '%-32s %10.3f ms' % ('registry + daniels', daniels)
+
+
+if __name__ == '__main__':
+    bench_pace_evaluation()
+    bench_group_generation()
+    bench_scenarios()
+    bench_cold_start()
@@ -38,6 +38,89 @@ class TestBaseFunctions(unittest.TestCase):
         self.assertEqual(week, 5)
 
 
+class TestGeneratorRegistry(unittest.TestCase):
+    """Test case for the generator registry"""
+
+    def test_builtin(self):
+        """the Daniels generator is registered by default"""
+        self.assertIn('daniels', TrainingPlanGenerator.get_generator_names())
+        generator = TrainingPlanGenerator.create_generator('daniels')
+        self.assertEqual(type(generator).__name__, 'DanielsTrainingPlanGenerator')
+        self.assertEqual(len(generator.generate_training_plan(12)), 12)
+
+    def test_lazy_registration(self):
+        """modules are not imported until the generator is used"""
+        TrainingPlanGenerator.register_generator('missing', 'NoSuchGeneratorModule:Generator')
+        self.assertIn('missing', TrainingPlanGenerator.get_generator_names())
+        self.assertRaises(TrainingPlanGenerator.GeneratorNotFoundException,
+                          TrainingPlanGenerator.create_generator, 'missing')
+        TrainingPlanGenerator.register_generator('missing', 'TrainingPlanGenerator:TrainingPlan')
+        self.assertRaises(TrainingPlanGenerator.GeneratorNotFoundException,
+                          TrainingPlanGenerator.create_generator, 'missing')
+
+    def test_register_class(self):
+        """generator classes can be registered directly"""
+        TrainingPlanGenerator.register_generator('base', TrainingPlanGenerator.TrainingPlanGenerator)
+        self.assertIs(TrainingPlanGenerator.get_generator_class('base'),
+                      TrainingPlanGenerator.TrainingPlanGenerator)
+        self.assertRaises(TrainingPlanGenerator.GeneratorNotFoundException,
+                          TrainingPlanGenerator.create_generator, 'unknown')
+
+
+class TestStructuralHash(unittest.TestCase):
+    """Test case for structural hashing and plan diffs"""
+
+    def build_plan(self, workouts):
+        """Build a one phase, one week plan with a day per workout"""
+        plan = TrainingPlanGenerator.TrainingPlan()
+        phase = TrainingPlanGenerator.TrainingPhase(1)
+        week = TrainingPlanGenerator.TrainingWeek()
+        week.weeknum = 1
+        for i, workout in enumerate(workouts):
+            day = TrainingPlanGenerator.TrainingDay(i + 1)
+            day.add_workout(workout)
+            week.add_day(day)
+        phase.add_week(week)
+        plan.add_phase(phase)
+        return plan
+
+    def test_equal_structure(self):
+        """identical plans hash the same"""
+        plan1 = self.build_plan(['E', 'T'])
+        plan2 = self.build_plan(['E', 'T'])
+        self.assertEqual(plan1.structural_hash(), plan2.structural_hash())
+        self.assertEqual(TrainingPlanGenerator.diff_plans(plan1, plan2), [])
+
+    def test_invalidate_on_mutation(self):
+        """mutating a node changes the hash of the plan containing it"""
+        plan = self.build_plan(['E', 'T'])
+        before = plan.structural_hash()
+        week = plan.get_week(0)
+        week.weeknum = 2
+        self.assertNotEqual(before, plan.structural_hash())
+        week.weeknum = 1
+        self.assertEqual(before, plan.structural_hash())
+        week.get_days()[1].add_workout('R')
+        self.assertNotEqual(before, plan.structural_hash())
+
+    def test_diff(self):
+        """diff reports only the changed subtrees"""
+        plan1 = self.build_plan(['E', 'T'])
+        plan2 = self.build_plan(['E', 'I', 'R'])
+        changes = TrainingPlanGenerator.diff_plans(plan1, plan2)
+        self.assertEqual([change[0] for change in changes], [(0, 0, 1, 0), (0, 0, 2)])
+        self.assertEqual(changes[0][1:], ('T', 'I'))
+        self.assertIsNone(changes[1][1])
+
+    def test_diff_changed_fields(self):
+        """nodes with changed fields are reported along with their changed children"""
+        plan1 = self.build_plan(['E', 'T'])
+        plan2 = self.build_plan(['E', 'I'])
+        plan2.get_phase(0).desc = 'Base'
+        changes = TrainingPlanGenerator.diff_plans(plan1, plan2)
+        self.assertEqual([change[0] for change in changes], [(0,), (0, 0, 1, 0)])
+
+
 if __name__ == '__main__':
     unittest.main()
 